@@ -1,20 +1,60 @@
 from functools import lru_cache
-from app.services import ai_service, emotion_service, audio_service
+from fastapi import Header, HTTPException, WebSocketException, status
+from fastapi.requests import HTTPConnection
 from app.core.config import settings
-from fastapi import Request
+from app.services.model_registry import ModelNotReady
+import secrets
 
 @lru_cache()
 def get_settings():
     return settings
 
-@lru_cache()
-def get_hf_models(request: Request):
-    return request.app.state.hf_models
+def require_admin(x_admin_token: str | None = Header(None)):
+    """Guards admin endpoints; they do not exist at all unless ADMIN_TOKEN is set."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
 
-@lru_cache()
-def get_emotion_detector(request: Request):
-    return request.app.state.emotion_detector
+def _get_model(connection: HTTPConnection, name: str):
+    """Fetches a model from the registry, answering 503 + Retry-After until it is ready."""
+    try:
+        return connection.app.state.models.get(name)
+    except ModelNotReady as e:
+        if connection.scope["type"] == "websocket":
+            raise WebSocketException(code=status.WS_1013_TRY_AGAIN_LATER, reason=str(e))
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
-@lru_cache()
-def get_whisper_model(request: Request):
-    return request.app.state.whisper_model
\ No newline at end of file
+def get_llm_backends(connection: HTTPConnection) -> dict:
+    return _get_model(connection, "llm")
+
+def get_llm_backend(role: str):
+    def dependency(connection: HTTPConnection):
+        return get_llm_backends(connection)[role]
+    return dependency
+
+def get_emotion_detector(connection: HTTPConnection):
+    return _get_model(connection, "emotion")
+
+def get_whisper_model(connection: HTTPConnection):
+    return _get_model(connection, "whisper")
+
+def get_keyword_model(connection: HTTPConnection):
+    return _get_model(connection, "keywords")
+
+def get_worker_pool(role: str):
+    def dependency(connection: HTTPConnection):
+        return connection.app.state.workers[role]
+    return dependency
+
+def get_browser_pool(connection: HTTPConnection):
+    return connection.app.state.browser_pool
+
+def get_image_executor(connection: HTTPConnection):
+    return connection.app.state.image_executor
+
+def get_vision_client(connection: HTTPConnection):
+    return connection.app.state.vision_client
+
+def get_vision_queue(connection: HTTPConnection):
+    return connection.app.state.vision_queue
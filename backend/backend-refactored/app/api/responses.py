@@ -0,0 +1,42 @@
+import gzip
+import brotli
+import orjson
+from fastapi import Request, Response
+from app.core.config import settings
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    """Parses Accept-Encoding into {coding: q}; codings with q=0 are refused."""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+def _choose_encoding(header: str) -> str | None:
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    # Brotli wins ties: it is both smaller and faster to decode than gzip for JSON.
+    best = max(("br", "gzip"), key=lambda coding: accepted.get(coding, wildcard))
+    return best if accepted.get(best, wildcard) > 0 else None
+
+def json_response(request: Request, content, status_code: int = 200) -> Response:
+    """Serializes with orjson and compresses with br/gzip as the client's Accept-Encoding allows."""
+    body = orjson.dumps(content)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= settings.RESPONSE_COMPRESS_MIN_BYTES:
+        encoding = _choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding == "br":
+            body = brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, PlainTextResponse
+from starlette.background import BackgroundTask
+from app.core.config import settings
+from app.api.deps import get_llm_backends, require_admin
+from app.services import ai_service, llm_backends, profiler_service
+from app.services.profiler_service import profiler
+import asyncio
+import os
+import tempfile
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+def _collapsed_response(collapsed: str) -> PlainTextResponse:
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"', "X-Profile-Samples": str(profiler.samples)},
+    )
+
+def _start(interval_ms: float, max_seconds: float):
+    try:
+        profiler.start(interval_ms / 1000, max_seconds)
+    except profiler_service.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/profile")
+async def profile_for(
+    seconds: float = Query(10, gt=0, le=300),
+    interval_ms: float = Query(10, ge=1, le=1000)
+):
+    """Samples all threads for `seconds` and returns collapsed stacks."""
+    _start(interval_ms, seconds)
+    await asyncio.sleep(seconds)
+    return _collapsed_response(await asyncio.to_thread(profiler.stop))
+
+@router.post("/profile/start")
+async def profile_start(
+    interval_ms: float = Query(10, ge=1, le=1000),
+    max_seconds: float = Query(120, gt=0, le=600)
+):
+    _start(interval_ms, max_seconds)
+    return {"status": "started", "interval_ms": interval_ms, "max_seconds": max_seconds}
+
+@router.post("/profile/stop")
+async def profile_stop():
+    if profiler.started_at is None:
+        raise HTTPException(status_code=409, detail="No profiling session has been started")
+    return _collapsed_response(await asyncio.to_thread(profiler.stop))
+
+@router.post("/profile/torch")
+async def profile_torch_generation(
+    request: Request,
+    question: str = Query("Explain photosynthesis."),
+    max_new_tokens: int = Query(32, ge=1, le=512)
+):
+    """Profiles one research generate() call with torch.profiler; returns a Chrome trace."""
+    if settings.DEPLOYMENT_MODE == "gateway":
+        raise HTTPException(status_code=501, detail="The LLM runs in a worker process; profile it there")
+
+    # Resolved here rather than as a dependency so gateway mode never touches the registry.
+    backend = get_llm_backends(request)["research"]
+    if not isinstance(backend, llm_backends.TransformersBackend):
+        raise HTTPException(status_code=501, detail=f"The research role runs on the {backend.kind} backend, not transformers")
+    fd, trace_path = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    prompt = ai_service.build_research_prompt(question, "neutral")
+    await asyncio.to_thread(
+        profiler_service.profile_generation, backend.tokenizer, backend.model, backend.device, prompt, max_new_tokens, trace_path
+    )
+    return FileResponse(
+        trace_path,
+        media_type="application/json",
+        filename="generate.trace.json",
+        background=BackgroundTask(os.remove, trace_path),
+    )
@@ -1,53 +1,173 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from app.models.schemas import ResearchQuery, SummarizeRequest
-from app.api.deps import get_hf_models
-from app.services import ai_service, file_service
-import os
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.models.schemas import ResearchQuery, LocalLLMRequest, SummarizeRequest, SummarizeBatchRequest
+from app.api.deps import get_llm_backend, get_vision_client, get_vision_queue
+from app.core.config import settings
+from app.services import ai_service, audio_service, image_service, llm_backends
+from app.services.llm_backends import GenerationControl
+from PIL import Image
 import asyncio
+import json
+import math
 
 router = APIRouter()
 
+async def _generate_until_disconnect(http_request: Request, control: GenerationControl, func, *args):
+    """Runs a blocking generation in a thread, cancelling it as soon as the client goes away."""
+    task = asyncio.ensure_future(asyncio.to_thread(func, *args, control))
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=settings.DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if control.reason is None and await http_request.is_disconnected():
+                control.cancel("disconnected")
+    except asyncio.CancelledError:
+        control.cancel("cancelled")
+        raise
+
 @router.post("/research")
 async def research_endpoint(
     query: ResearchQuery,
-    models: tuple = Depends(get_hf_models)
+    http_request: Request,
+    backend = Depends(get_llm_backend("research"))
 ):
-    tokenizer, model_research, _, device = models
-    answer = await asyncio.to_thread(
+    answer = await _generate_until_disconnect(
+        http_request,
+        GenerationControl.for_role("research"),
         ai_service.generate_research_response, 
-        tokenizer, 
-        model_research, 
-        device, 
+        backend, 
         query.question, 
-        query.emotion
+        query.emotion,
+        query.level
     )
     return {"answer": answer}
 
+@router.post("/local_llm")
+async def local_llm_endpoint(
+    request: LocalLLMRequest,
+    http_request: Request,
+    backend = Depends(get_llm_backend("research"))
+):
+    """Learning mode: a structured lesson sized by `level`, generated on the research model."""
+    if request.mode != "learning":
+        raise HTTPException(status_code=422, detail=f"Unsupported mode '{request.mode}', expected 'learning'")
+    control = GenerationControl.for_role("research")
+
+    if request.stream:
+        async def chunks():
+            lesson = ai_service.stream_lesson(backend, request.query, request.level, control)
+            async for delta in llm_backends.iterate_in_thread(lesson, control):
+                yield delta
+
+        return StreamingResponse(chunks(), media_type="text/plain; charset=utf-8")
+
+    lesson = await _generate_until_disconnect(
+        http_request, control, ai_service.generate_lesson, backend, request.query, request.level
+    )
+    return {"query": request.query, "mode": request.mode, "response": lesson}
+
 @router.post("/summarize")
 async def summarize_endpoint(
     request: SummarizeRequest,
-    models: tuple = Depends(get_hf_models)
+    http_request: Request,
+    backend = Depends(get_llm_backend("summarize"))
 ):
-    tokenizer, _, model_summarize, device = models
-    summary = await asyncio.to_thread(
+    summary = await _generate_until_disconnect(
+        http_request,
+        GenerationControl.for_role("summarize"),
         ai_service.generate_summary,
-        tokenizer,
-        model_summarize,
-        device,
+        backend,
         request.content
     )
     return {"answer": summary}
+
+@router.post("/summarize/speak")
+async def summarize_and_speak_endpoint(
+    request: SummarizeRequest,
+    backend = Depends(get_llm_backend("summarize"))
+):
+    """Streams NDJSON events: text deltas, base64 WAV per finished sentence, then the full answer."""
+    control = GenerationControl.for_role("summarize")
+
+    async def events():
+        deltas = llm_backends.iterate_in_thread(ai_service.stream_summary(backend, request.content, control), control)
+        text = []
+        async for event in audio_service.speak_text_stream(deltas):
+            if event["type"] == "text":
+                text.append(event["delta"])
+            yield json.dumps(event) + "\n"
+        yield json.dumps({"type": "done", "answer": "".join(text).strip()}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.post("/summarize/batch")
+async def summarize_batch_endpoint(
+    request: SummarizeBatchRequest,
+    backend = Depends(get_llm_backend("summarize"))
+):
+    """Streams one NDJSON line per item, {"index", "answer"}, as each summary finishes."""
+    if not 0 < len(request.contents) <= settings.SUMMARIZE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"contents must hold 1-{settings.SUMMARIZE_BATCH_MAX_ITEMS} items")
+    control = ai_service.summary_batch_control(len(request.contents))
+
+    async def lines():
+        results = ai_service.generate_summaries(backend, request.contents, control)
+        async for index, summary in llm_backends.iterate_in_thread(results, control):
+            yield json.dumps({"index": index, "answer": summary}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
     
 @router.post("/analyze-image")
-async def analyze_image_endpoint(file: UploadFile = File(...)):
-    temp_file_path = file_service.save_temp_file(file)
+async def analyze_image_endpoint(
+    file: UploadFile = File(...),
+    text_mode: bool | None = Form(None),
+    stream: bool = Form(False),
+    client = Depends(get_vision_client),
+    queue: ai_service.VisionQueue = Depends(get_vision_queue)
+):
+    raw_bytes = await file.read()
+    await file.close()
+    try:
+        image_bytes = await asyncio.to_thread(image_service.prepare_for_vision, raw_bytes, text_mode)
+    except (OSError, Image.DecompressionBombError) as e:
+        # UnidentifiedImageError and truncated files are OSErrors.
+        raise HTTPException(status_code=400, detail=f"Could not decode image: {e}")
+
+    try:
+        started = await queue.acquire()
+    except ai_service.VisionSaturated as e:
+        raise HTTPException(status_code=503, detail=e.detail(), headers={"Retry-After": str(math.ceil(e.eta_seconds))})
+
+    if stream:
+        released = False
+
+        def release_slot():
+            # Runs from the generator or, if it never started, the background task.
+            nonlocal released
+            if not released:
+                released = True
+                queue.release(started)
+
+        async def answer_chunks():
+            try:
+                async for chunk in ai_service.stream_image_analysis(client, image_bytes, file.filename):
+                    yield chunk
+            finally:
+                release_slot()
+
+        return StreamingResponse(
+            answer_chunks(),
+            media_type="text/plain; charset=utf-8",
+            background=BackgroundTask(release_slot),
+        )
+
     try:
-        model_output = ai_service.analyze_image_with_ollama(temp_file_path)
+        model_output = await ai_service.analyze_image_with_ollama(client, image_bytes, file.filename)
         print("Model output:", model_output)
-        # model_output = "dummy response"
         return {"filename": file.filename, "response": model_output}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+        queue.release(started)
@@ -0,0 +1,72 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.models.schemas import ResearchQuery
+from app.api.deps import get_keyword_model, get_llm_backends
+from app.services import ai_service, external_api_service, keyword_service
+from app.services.llm_backends import GenerationControl
+import asyncio
+import json
+
+# One request per question: the answer, scholar results and carousel images
+# are produced concurrently and streamed as NDJSON parts in completion order.
+router = APIRouter()
+
+async def _answer(http_request: Request, query: ResearchQuery) -> dict:
+    if settings.DEPLOYMENT_MODE == "gateway":
+        pool = http_request.app.state.workers["llm"]
+        # Cancelling this call (timeout or client gone) closes the worker connection, which stops the generation there.
+        return {"answer": await pool.call("research", query.question, query.emotion, query.level)}
+
+    backend = get_llm_backends(http_request)["research"]
+    control = GenerationControl.for_role("research")
+    try:
+        answer = await asyncio.to_thread(
+            ai_service.generate_research_response, backend, query.question, query.emotion, query.level, control
+        )
+    except asyncio.CancelledError:
+        # Timed out or the client left; the generation thread stops at its next step.
+        control.cancel("cancelled")
+        raise
+    return {"answer": answer}
+
+async def _scholar(query: ResearchQuery) -> dict:
+    result = await asyncio.to_thread(external_api_service.search_serper_scholar, query.question)
+    return {"data": external_api_service.project_scholar(result)}
+
+async def _images(http_request: Request, query: ResearchQuery) -> dict:
+    model = get_keyword_model(http_request)
+    keywords = await asyncio.to_thread(keyword_service.cached_keywords, model, query.question)
+    return {"answer": await asyncio.to_thread(external_api_service.image_urls_for_keywords, keywords), "keywords": keywords}
+
+async def _part(name: str, branch) -> dict:
+    """Runs one branch under its timeout; failures become an error part instead of failing the bundle."""
+    timeout = settings.BUNDLE_TIMEOUTS[name]
+    try:
+        return {"part": name, **await asyncio.wait_for(branch, timeout)}
+    except asyncio.TimeoutError:
+        return {"part": name, "error": f"Timed out after {timeout:.0f}s"}
+    except HTTPException as e:
+        return {"part": name, "error": str(e.detail), "status": e.status_code}
+    except Exception as e:
+        return {"part": name, "error": str(e)}
+
+@router.post("/research/bundle")
+async def research_bundle_endpoint(query: ResearchQuery, http_request: Request):
+    """Streams {"part": "answer" | "scholar" | "images", ...} lines as each finishes, then {"part": "done"}."""
+    async def parts():
+        tasks = [
+            asyncio.create_task(_part("answer", _answer(http_request, query))),
+            asyncio.create_task(_part("scholar", _scholar(query))),
+            asyncio.create_task(_part("images", _images(http_request, query))),
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+            yield json.dumps({"part": "done"}) + "\n"
+        finally:
+            # The client went away: stop whatever is still running.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(parts(), media_type="application/x-ndjson")
@@ -2,15 +2,13 @@ from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, WebSock
 from app.models.schemas import ImagePayload
 from app.services import emotion_service
 from app.api.deps import get_emotion_detector
-from fer import FER
-import base64
 
 router = APIRouter()
 
 @router.post("/detect-emotion")
 async def detect_emotion_from_upload(
     file: UploadFile = File(...),
-    detector: FER = Depends(get_emotion_detector)
+    detector = Depends(get_emotion_detector)
 ):
     try:
         contents = await file.read()
@@ -22,10 +20,10 @@ async def detect_emotion_from_upload(
 @router.post("/emotion")
 async def detect_emotion_from_base64(
     payload: ImagePayload,
-    detector: FER = Depends(get_emotion_detector)
+    detector = Depends(get_emotion_detector)
 ):
     try:
-        image_data = base64.b64decode(payload.image_data.split(",")[1])
+        image_data = emotion_service.decode_data_url(payload.image_data)
         result = emotion_service.detect_emotion_from_bytes(detector, image_data)
         return result
     except Exception as e:
@@ -36,13 +34,13 @@ async def detect_emotion_from_base64(
 @router.websocket("/ws/emotion")
 async def websocket_emotion_detection(
     websocket: WebSocket,
-    detector: FER = Depends(get_emotion_detector)
+    detector = Depends(get_emotion_detector)
 ):
     await websocket.accept()
     try:
         while True:
             data = await websocket.receive_text()
-            image_data = base64.b64decode(data.split(",")[1])
+            image_data = emotion_service.decode_data_url(data)
             result = emotion_service.detect_emotion_from_bytes(detector, image_data)
             await websocket.send_json(result)
     except WebSocketDisconnect:
@@ -1,20 +1,46 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, File, HTTPException, Query, Request, UploadFile
 from app.models.schemas import SerperQuery, SerperLensQuery
-from app.services import external_api_service
+from app.api.responses import json_response
+from app.services import external_api_service, file_service, image_service
+import asyncio
 import requests
 
 router = APIRouter()
 
+# Responses are projected to the fields the tiles render; ?full=true returns Serper's payload verbatim.
+FULL_QUERY = Query(False, description="Return the upstream Serper payload unmodified")
+
 @router.post("/search-scholar")
-def search_scholar_endpoint(data: SerperQuery):
+def search_scholar_endpoint(data: SerperQuery, request: Request, full: bool = FULL_QUERY):
     try:
-        return external_api_service.search_serper_scholar(data.q)
+        result = external_api_service.search_serper_scholar(data.q)
     except requests.RequestException as e:
         raise HTTPException(status_code=502, detail=f"Serper API failed: {e}")
+    return json_response(request, result if full else external_api_service.project_scholar(result))
 
 @router.post("/search-lens")
-def search_lens_endpoint(data: SerperLensQuery):
+def search_lens_endpoint(data: SerperLensQuery, request: Request, full: bool = FULL_QUERY):
+    image_url = file_service.lens_url_for(request, data.url)
     try:
-        return external_api_service.search_serper_lens(data.url)
+        result = external_api_service.search_serper_lens(image_url)
     except requests.RequestException as e:
-        raise HTTPException(status_code=502, detail=f"Serper API failed: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=502, detail=f"Serper API failed: {e}")
+    return json_response(request, result if full else external_api_service.project_lens(result))
+
+@router.post("/search-lens/upload")
+async def upload_and_search_lens_endpoint(request: Request, file: UploadFile = File(...), full: bool = FULL_QUERY):
+    """Stores the image and runs Lens on it in one request, answering repeat images from cache."""
+    image_path, image_hash = await file_service.save_upload_hashed(file)
+    url = file_service.public_image_url(request, image_path)
+    result = external_api_service.cached_lens_result(image_hash)
+    hit = result is not None
+    if not hit:
+        derived_path = await asyncio.to_thread(image_service.prepare_for_lens, image_path, image_hash)
+        try:
+            result, hit = await asyncio.to_thread(
+                external_api_service.search_lens_by_hash, image_hash, file_service.public_image_url(request, derived_path)
+            )
+        except requests.RequestException as e:
+            raise HTTPException(status_code=502, detail=f"Serper API failed: {e}")
+    lens = result if full else external_api_service.project_lens(result)
+    return json_response(request, {"url": url, "cached": hit, "lens": lens})
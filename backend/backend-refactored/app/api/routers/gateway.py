@@ -0,0 +1,177 @@
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from app.core.config import settings
+from app.models.schemas import ResearchQuery, LocalLLMRequest, SummarizeRequest, SummarizeBatchRequest, ImagePayload, TTSRequest
+from app.api.deps import get_worker_pool, get_vision_queue
+from app.services import ai_service, audio_service, emotion_service, image_service
+from app.workers.client import WorkerPool, WorkerUnavailable, WorkerError
+from PIL import Image
+import asyncio
+import json
+import math
+
+# Same paths as the ai_processing, audio and emotion routers, but every call
+# is forwarded to the role's worker processes instead of a local model.
+router = APIRouter()
+
+async def _forward(pool: WorkerPool, op: str, *args):
+    try:
+        return await pool.call(op, *args)
+    except WorkerUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(settings.MODEL_RETRY_SECONDS)})
+    except WorkerError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _forward_until_disconnect(http_request: Request, pool: WorkerPool, op: str, *args):
+    """_forward, abandoning the call once the client goes away.
+
+    Abandoning closes the worker connection, which cancels the generation in the worker.
+    """
+    task = asyncio.ensure_future(_forward(pool, op, *args))
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=settings.DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+@router.post("/research")
+async def research_endpoint(query: ResearchQuery, http_request: Request, pool: WorkerPool = Depends(get_worker_pool("llm"))):
+    answer = await _forward_until_disconnect(http_request, pool, "research", query.question, query.emotion, query.level)
+    return {"answer": answer}
+
+@router.post("/local_llm")
+async def local_llm_endpoint(request: LocalLLMRequest, http_request: Request, pool: WorkerPool = Depends(get_worker_pool("llm"))):
+    if request.mode != "learning":
+        raise HTTPException(status_code=422, detail=f"Unsupported mode '{request.mode}', expected 'learning'")
+    if request.stream:
+        return StreamingResponse(pool.stream("stream_lesson", request.query, request.level), media_type="text/plain; charset=utf-8")
+    lesson = await _forward_until_disconnect(http_request, pool, "lesson", request.query, request.level)
+    return {"query": request.query, "mode": request.mode, "response": lesson}
+
+@router.post("/summarize")
+async def summarize_endpoint(request: SummarizeRequest, http_request: Request, pool: WorkerPool = Depends(get_worker_pool("llm"))):
+    return {"answer": await _forward_until_disconnect(http_request, pool, "summarize", request.content)}
+
+@router.post("/summarize/speak")
+async def summarize_and_speak_endpoint(
+    request: SummarizeRequest,
+    llm_pool: WorkerPool = Depends(get_worker_pool("llm")),
+    tts_pool: WorkerPool = Depends(get_worker_pool("tts"))
+):
+    async def synthesize(sentence: str) -> bytes:
+        return await tts_pool.call("synthesize", sentence)
+
+    async def events():
+        text = []
+        deltas = llm_pool.stream("stream_summary", request.content)
+        async for event in audio_service.speak_text_stream(deltas, synthesize):
+            if event["type"] == "text":
+                text.append(event["delta"])
+            yield json.dumps(event) + "\n"
+        yield json.dumps({"type": "done", "answer": "".join(text).strip()}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.post("/summarize/batch")
+async def summarize_batch_endpoint(request: SummarizeBatchRequest, pool: WorkerPool = Depends(get_worker_pool("llm"))):
+    if not 0 < len(request.contents) <= settings.SUMMARIZE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"contents must hold 1-{settings.SUMMARIZE_BATCH_MAX_ITEMS} items")
+
+    async def lines():
+        async for index, summary in pool.stream("summarize_batch", request.contents):
+            yield json.dumps({"index": index, "answer": summary}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.post("/analyze-image")
+async def analyze_image_endpoint(
+    file: UploadFile = File(...),
+    text_mode: bool | None = Form(None),
+    stream: bool = Form(False),
+    pool: WorkerPool = Depends(get_worker_pool("vision")),
+    queue: ai_service.VisionQueue = Depends(get_vision_queue)
+):
+    raw_bytes = await file.read()
+    await file.close()
+    try:
+        image_bytes = await asyncio.to_thread(image_service.prepare_for_vision, raw_bytes, text_mode)
+    except (OSError, Image.DecompressionBombError) as e:
+        # UnidentifiedImageError and truncated files are OSErrors.
+        raise HTTPException(status_code=400, detail=f"Could not decode image: {e}")
+
+    try:
+        started = await queue.acquire()
+    except ai_service.VisionSaturated as e:
+        raise HTTPException(status_code=503, detail=e.detail(), headers={"Retry-After": str(math.ceil(e.eta_seconds))})
+
+    if stream:
+        released = False
+
+        def release_slot():
+            nonlocal released
+            if not released:
+                released = True
+                queue.release(started)
+
+        async def answer_chunks():
+            try:
+                async for chunk in pool.stream("stream", image_bytes, file.filename):
+                    yield chunk
+            finally:
+                release_slot()
+
+        return StreamingResponse(
+            answer_chunks(),
+            media_type="text/plain; charset=utf-8",
+            background=BackgroundTask(release_slot),
+        )
+
+    try:
+        model_output = await _forward(pool, "analyze", image_bytes, file.filename)
+        return {"filename": file.filename, "response": model_output}
+    finally:
+        queue.release(started)
+
+@router.post("/transcribe")
+async def transcribe_audio_endpoint(file: UploadFile = File(...), pool: WorkerPool = Depends(get_worker_pool("stt"))):
+    if file.content_type != "audio/webm":
+        raise HTTPException(status_code=400, detail="Invalid file type, must be audio/webm")
+    transcription = await _forward(pool, "transcribe", await file.read())
+    return JSONResponse(content={"prompt": "Say something about your favorite technology.", "transcription": transcription})
+
+@router.post("/text-to-speech")
+async def text_to_speech_endpoint(request: TTSRequest, pool: WorkerPool = Depends(get_worker_pool("tts"))):
+    audio_data = await _forward(pool, "synthesize", request.text)
+    return Response(content=audio_data, media_type="audio/wav")
+
+@router.post("/detect-emotion")
+async def detect_emotion_from_upload(file: UploadFile = File(...), pool: WorkerPool = Depends(get_worker_pool("emotion"))):
+    return await _forward(pool, "detect", await file.read())
+
+@router.post("/emotion")
+async def detect_emotion_from_base64(payload: ImagePayload, pool: WorkerPool = Depends(get_worker_pool("emotion"))):
+    try:
+        image_data = emotion_service.decode_data_url(payload.image_data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing image: {e}")
+    return await _forward(pool, "detect", image_data)
+
+@router.websocket("/ws/emotion")
+async def websocket_emotion_detection(websocket: WebSocket, pool: WorkerPool = Depends(get_worker_pool("emotion"))):
+    await websocket.accept()
+    try:
+        while True:
+            data = await websocket.receive_text()
+            image_data = emotion_service.decode_data_url(data)
+            await websocket.send_json(await pool.call("detect", image_data))
+    except WebSocketDisconnect:
+        print("WebSocket disconnected")
+    except Exception as e:
+        print(f"WebSocket error: {e}")
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from PIL import Image
+from typing import Literal
+from app.core.config import settings
+from app.api.deps import get_image_executor
+from app.services import image_service
+
+router = APIRouter()
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """If-None-Match uses weak comparison: any listed tag (W/ or not) or `*` matches."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+@router.get("/images/{name:path}")
+async def image_variant(
+    name: str,
+    request: Request,
+    w: int = Query(480, ge=1, le=4096, description="Target width; snapped up to IMAGE_VARIANT_WIDTHS"),
+    fmt: Literal["auto", "webp", "jpeg"] = "auto",
+    executor = Depends(get_image_executor)
+):
+    """Serves a resized WebP/JPEG variant of an image under /static/images, rendered once and cached on disk."""
+    image_dir = settings.IMAGE_DIR.resolve()
+    source = (image_dir / name).resolve()
+    if not source.is_relative_to(image_dir) or (image_dir / "variants") in source.parents or not source.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    if fmt == "auto":
+        fmt = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+    width = image_service.variant_width(w)
+
+    headers = {
+        "ETag": image_service.variant_etag(source, width, fmt),
+        # Originals are never rewritten in place, so a variant URL always maps to the same bytes.
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept",
+    }
+    if _etag_matches(headers["ETag"], request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        variant = await image_service.ensure_variant(executor, source, width, fmt)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise HTTPException(status_code=415, detail=f"Could not render image variant: {e}")
+    return FileResponse(variant, media_type=image_service.VARIANT_MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.models.schemas import KeywordRequest
+from app.api.deps import get_keyword_model
+from app.services import external_api_service, keyword_service
+import asyncio
+import requests
+
+router = APIRouter()
+
+@router.post("/gen_keywords")
+async def gen_keywords_endpoint(
+    request: KeywordRequest,
+    model = Depends(get_keyword_model)
+):
+    """Extracts keywords from the query and returns matching image URLs as {"answer": [...]}."""
+    text = request.query or request.question
+    if not text or not text.strip():
+        raise HTTPException(status_code=422, detail="Either 'query' or 'question' is required")
+
+    keywords = await asyncio.to_thread(keyword_service.cached_keywords, model, text)
+    try:
+        images = await asyncio.to_thread(external_api_service.image_urls_for_keywords, keywords)
+    except requests.RequestException as e:
+        raise HTTPException(status_code=502, detail=f"Serper API failed: {e}")
+    return {"answer": images, "keywords": keywords}
@@ -1,35 +1,33 @@
-from fastapi import FastAPI, Query, APIRouter
-from fastapi.responses import FileResponse
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import tempfile
-import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from app.core.config import settings
+from app.api.deps import get_browser_pool
+from app.services import screenshot_service
+import asyncio
 
 router = APIRouter()
 
-# Path to your Chrome profile
-CHROME_PROFILE_PATH = r"C:\Users\eren\AppData\Local\Google\Chrome\User Data\Default"  # Linux
-# On Windows: r"C:\Users\<YourUser>\AppData\Local\Google\Chrome\User Data\Default"
-
 @router.get("/screenshot")
-def screenshot(url: str = Query(..., description="URL to capture")):
+async def screenshot(
+    url: str = Query(..., description="URL to capture"),
+    width: int | None = Query(None, ge=320, le=1920),
+    height: int | None = Query(None, ge=240, le=1920),
+    thumb: int | None = Query(None, ge=64, le=1024, description="Return a JPEG thumbnail this many pixels wide"),
+    pool: screenshot_service.BrowserPool = Depends(get_browser_pool)
+):
     if not url.startswith(("http://", "https://")):
         url = "https://" + url
+    width = width or settings.SCREENSHOT_VIEWPORT[0]
+    height = height or settings.SCREENSHOT_VIEWPORT[1]
 
-    tmp_file = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-    tmp_path = tmp_file.name
-    tmp_file.close()
-
-    chrome_options = Options()
-    chrome_options.add_argument(f"user-data-dir={os.path.dirname(CHROME_PROFILE_PATH)}")
-    chrome_options.add_argument(f"profile-directory={os.path.basename(CHROME_PROFILE_PATH)}")
-    chrome_options.add_argument("--headless=new")  # Headless Chrome
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1280,800")
-
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.get(url)
-    driver.save_screenshot(tmp_path)
-    driver.quit()
+    try:
+        image = await asyncio.to_thread(screenshot_service.capture, pool, url, width, height, thumb)
+    except screenshot_service.BrowserUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Screenshot failed: {e}")
 
-    return FileResponse(tmp_path, media_type="image/png", filename="screenshot.png")
+    return Response(
+        content=image,
+        media_type="image/jpeg" if thumb else "image/png",
+        headers={"Cache-Control": f"public, max-age={settings.SCREENSHOT_CACHE_TTL_SECONDS}"},
+    )
@@ -1,14 +1,20 @@
 from fastapi import APIRouter, Request, File, UploadFile, Depends
 from fastapi.responses import JSONResponse
-from app.core.config import Settings
+from app.core.config import Settings, settings
 from app.api.deps import get_settings
 from app.services import file_service
 
 router = APIRouter()
 
 @router.get("/health")
-async def health_check():
-    return {"status": "ok"}
+async def health_check(request: Request):
+    registry = request.app.state.models
+    if settings.DEPLOYMENT_MODE == "gateway":
+        workers = {role: await pool.status() for role, pool in request.app.state.workers.items()}
+        ready = registry.all_ready() and all(status["ready"] for status in workers.values())
+        return {"status": "ok" if ready else "degraded", "workers": workers, "models": registry.status()}
+
+    return {"status": "ok" if registry.all_ready() else "degraded", "models": registry.status()}
 
 @router.post("/upload-image")
 async def upload_image_endpoint(request: Request, file: UploadFile = File(...)):
@@ -13,12 +13,111 @@ class Settings(BaseSettings):
     PIPER_MODEL_PATH: str
     IMAGE_DIR: Path = BASE_DIR / "static" / "images"
     TEMP_DIR: Path = BASE_DIR / "temp_uploads"
+    # Serper Lens results keyed by image content hash
+    LENS_CACHE_DIR: Path = BASE_DIR / "cache" / "lens"
+    LENS_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    SERPER_LENS_MAX_RESULTS: int = 10  # ImageSearchTiles shows the first five
+
+    # JSON responses from app.api.responses.json_response
+    RESPONSE_COMPRESS_MIN_BYTES: int = 1024
+    RESPONSE_BROTLI_QUALITY: int = 5
+    RESPONSE_GZIP_LEVEL: int = 6
 
     # Model IDs
     HF_MODEL_ID: str = "meta-llama/Llama-3.2-1B-Instruct"
     WHISPER_MODEL_SIZE: str = "small"
     OLLAMA_MODEL_NAME: str = "gemma3:4b"
 
+    # CPU quantization for the research/summarize models:
+    # "none" | "int8-dynamic" | "int8-weight" | "int4-weight" (weight-only modes need optimum-quanto)
+    LLM_QUANTIZATION: str = "none"
+    LLM_QUANTIZATION_MIN_AGREEMENT: float = 0.9
+
+    # LLM engine per role: "transformers" (HF_MODEL_ID) | "gguf" (llama.cpp) | "ollama" (OLLAMA_LLM_MODEL)
+    RESEARCH_BACKEND: str = "transformers"
+    SUMMARIZE_BACKEND: str = "transformers"
+    GGUF_MODEL_PATH: Path | None = None
+    GGUF_N_CTX: int = 4096  # KV cache size in tokens
+    GGUF_N_THREADS: int | None = None  # None lets llama.cpp pick
+    GGUF_N_BATCH: int = 512
+    GGUF_PROMPT_CACHE_MB: int = 256  # reuses KV state for repeated prompt prefixes; 0 disables
+    # Speculative decoding for the transformers backend: "off" | "draft" | "prompt-lookup".
+    # The draft model must share HF_MODEL_ID's tokenizer.
+    LLM_SPECULATIVE: str = "off"
+    LLM_DRAFT_MODEL_ID: str | None = None
+    LLM_DRAFT_TOKENS: int = 5
+    LLM_PROMPT_LOOKUP_TOKENS: int = 10
+    # Wall-clock budget per generation; whatever was generated by then is returned
+    LLM_DEADLINE_SECONDS: dict[str, float] = {"research": 300.0, "summarize": 60.0}
+    # Per-part time limits for /research/bundle
+    BUNDLE_TIMEOUTS: dict[str, float] = {"answer": 300.0, "scholar": 20.0, "images": 20.0}
+    # Research answer budget (max new tokens) per learning level
+    RESEARCH_LEVEL_TOKENS: dict[int, int] = {1: 384, 2: 640, 3: 1024}
+    # Long summarize inputs are cut down to their key sentences first (0 disables)
+    SUMMARY_INPUT_TOKEN_BUDGET: int = 768
+    COMPRESSION_CHUNK_SENTENCES: int = 300
+    # Batched generation: rows per generate() call, and items accepted per /summarize/batch request
+    LLM_MAX_BATCH_SIZE: int = 10
+    SUMMARIZE_BATCH_MAX_ITEMS: int = 30
+    # How often a waiting request checks whether its client went away
+    DISCONNECT_POLL_SECONDS: float = 0.5
+    OLLAMA_LLM_MODEL: str = "llama3.2:1b"
+    OLLAMA_LLM_TIMEOUT: float = 300.0
+
+    # Keyword extraction for /gen_keywords
+    KEYWORD_MODEL_ID: str = "sentence-transformers/all-MiniLM-L6-v2"
+    KEYWORD_TOP_N: int = 3
+    KEYWORD_DIVERSITY: float = 0.5
+    KEYWORD_CACHE_SIZE: int = 1024
+    KEYWORD_IMAGE_COUNT: int = 8
+
+    # Model loading: names listed here ("llm", "emotion", "whisper", "keywords") load on first use
+    LAZY_MODELS: list[str] = []
+    MODEL_RETRY_SECONDS: int = 30
+
+    # /screenshot: warm headless Chrome pool and in-memory capture cache
+    SCREENSHOT_POOL_SIZE: int = 2
+    SCREENSHOT_PREWARM: bool = True
+    SCREENSHOT_MAX_USES: int = 50  # captures before a browser is recycled
+    SCREENSHOT_TIMEOUT: float = 15.0  # page load limit; what has rendered by then is captured
+    SCREENSHOT_ACQUIRE_TIMEOUT: float = 30.0
+    SCREENSHOT_VIEWPORT: tuple[int, int] = (1280, 800)
+    SCREENSHOT_CACHE_SIZE: int = 64
+    SCREENSHOT_CACHE_TTL_SECONDS: int = 300
+
+    # Admin endpoints (/api/admin/*) are disabled unless a token is configured
+    ADMIN_TOKEN: str | None = None
+
+    # Tracing: spans are appended to TRACE_FILE as JSON lines when enabled
+    TRACING_ENABLED: bool = False
+    TRACE_FILE: Path = BASE_DIR.parent / "traces" / "traces.jsonl"
+
+    # Deployment: "monolith" loads every model in-process; "gateway" forwards
+    # inference to per-role worker processes (see app/workers/launcher.py)
+    DEPLOYMENT_MODE: str = "monolith"
+    # Must be private to the service user (workers exchange pickle frames); unset means
+    # $XDG_RUNTIME_DIR/robolearn-workers, or a fresh mkdtemp dir created by the launcher.
+    WORKER_SOCKET_DIR: Path | None = None
+    WORKER_REPLICAS: dict[str, int] = {"llm": 1, "stt": 1, "tts": 1, "emotion": 1, "vision": 1}
+
+    # Vision (Ollama or any Ollama-compatible server)
+    OLLAMA_HOST: str = "http://127.0.0.1:11434"
+    VISION_MAX_CONCURRENCY: int = 1
+    VISION_MAX_QUEUE: int = 8
+    VISION_TIMEOUT: float = 300.0
+
+    # Image preprocessing
+    VISION_MAX_SIDE: int = 896  # gemma3 vision encoder works at 896x896
+    VISION_TEXT_MODE: bool = False  # grayscale + autocontrast for text-heavy photos
+    LENS_MAX_SIDE: int = 1024
+    IMAGE_JPEG_QUALITY: int = 85
+    IMAGE_CACHE_SIZE: int = 64
+
+    # /api/images/{name}: resized variants rendered on demand and kept under IMAGE_DIR/variants
+    IMAGE_VARIANT_WIDTHS: list[int] = [160, 320, 480, 640, 960, 1280, 1920]
+    IMAGE_VARIANT_WORKERS: int = 2
+    IMAGE_WEBP_QUALITY: int = 80
+
     # CORS
     ALLOWED_ORIGINS: list[str] = ["https://erenyeager-dk.live","*"]
 
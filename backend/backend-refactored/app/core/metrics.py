@@ -0,0 +1,256 @@
+"""Minimal Prometheus-style instrumentation.
+
+Metric updates are plain integer/float increments on pre-allocated slots with
+no locking: under the GIL a racing update can at worst be lost, which is an
+acceptable trade for keeping the hot paths cheap. Bind label values once with
+`.labels(...)` and keep the child around in hot code so that observing a value
+does not allocate.
+"""
+import math
+import time
+from bisect import bisect_left
+from typing import Callable
+
+# Latency buckets in seconds, from sub-millisecond framing up to long generations.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+RATIO_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+
+_REGISTRY: list["_Metric"] = []
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._children: dict[tuple, object] = {}
+        _REGISTRY.append(self)
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        raise NotImplementedError
+
+    def _label_dict(self, values: tuple) -> dict:
+        return dict(zip(self.labelnames, values))
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def samples(self):
+        return [(self.name + "_total", self._label_dict(k), c.value) for k, c in self._children.items()]
+
+class _GaugeChild:
+    __slots__ = ("value", "function")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function: Callable[[], float] | None = None
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Reads the value from `function` at scrape time instead of tracking it."""
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function is not None else self.value
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def samples(self):
+        return [(self.name, self._label_dict(k), g.get()) for k, g in self._children.items()]
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+class _Timer:
+    __slots__ = ("child", "started")
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.started)
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help_text, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self):
+        samples = []
+        for key, child in self._children.items():
+            labels = self._label_dict(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(float(bound))
+                samples.append((self.name + "_bucket", {**labels, "le": le}, cumulative))
+            samples.append((self.name + "_sum", labels, child.sum))
+            samples.append((self.name + "_count", labels, child.count))
+        return samples
+
+def collect() -> list[dict]:
+    """Snapshot of every metric family, picklable so workers can ship it to the gateway."""
+    return [
+        {"name": m.name, "type": m.type_name, "help": m.help_text, "samples": m.samples()}
+        for m in _REGISTRY
+    ]
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+def render(families: list[dict]) -> str:
+    """Renders collected families in the Prometheus text exposition format."""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family['name']} {family['help']}")
+        lines.append(f"# TYPE {family['name']} {family['type']}")
+        for name, labels, value in family["samples"]:
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+def merge(local: list[dict], remote: dict[str, list[dict]]) -> list[dict]:
+    """Folds worker snapshots into the local families, tagging samples with a `worker` label."""
+    merged = {family["name"]: {**family, "samples": list(family["samples"])} for family in local}
+    for worker, families in remote.items():
+        for family in families:
+            target = merged.setdefault(family["name"], {**family, "samples": []})
+            target["samples"].extend((name, {**labels, "worker": worker}, value) for name, labels, value in family["samples"])
+    return list(merged.values())
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per router and route."""
+    _STATUS_CLASSES = tuple(f"{i}xx" for i in range(6))
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # FastAPI stores the matched route in the scope; static mounts have none.
+            route = scope.get("route")
+            path = getattr(route, "path", "other")
+            tags = getattr(route, "tags", None)
+            router = tags[0] if tags else "other"
+            HTTP_REQUEST_SECONDS.labels(router, path, self._STATUS_CLASSES[min(status // 100, 5)]).observe(
+                time.perf_counter() - started
+            )
+
+# --- Metric families ---------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by router and route.", ("router", "route", "status")
+)
+
+LLM_PREFILL_SECONDS = Histogram(
+    "llm_prefill_seconds", "Time to first generated token (prompt prefill).", ("role",)
+)
+LLM_DECODE_SECONDS = Histogram(
+    "llm_decode_seconds", "Time spent generating tokens after the first one.", ("role",)
+)
+LLM_DECODE_TOKENS_PER_SECOND = Histogram(
+    "llm_decode_tokens_per_second", "Decode throughput per generation.", ("role",), buckets=RATE_BUCKETS
+)
+LLM_GENERATED_TOKENS = Counter("llm_generated_tokens", "Tokens generated by the LLM.", ("role",))
+LLM_ACTIVE_GENERATIONS = Gauge("llm_active_generations", "Generations currently running.", ("role",))
+LLM_STOPPED_GENERATIONS = Counter(
+    "llm_stopped_generations", "Generations cut short before end-of-turn or max_new_tokens.", ("role", "reason")
+)
+
+QUEUE_DEPTH = Gauge("queue_depth", "Jobs waiting or running per worker pool.", ("pool", "state"))
+
+WHISPER_AUDIO_SECONDS = Counter("whisper_audio_seconds", "Seconds of audio transcribed.")
+WHISPER_WALL_SECONDS = Counter("whisper_wall_seconds", "Wall-clock seconds spent transcribing.")
+
+PIPER_REAL_TIME_FACTOR = Histogram(
+    "piper_real_time_factor", "Piper synthesis time divided by audio duration.", buckets=RATIO_BUCKETS
+)
+
+EMOTION_FRAMES = Counter("emotion_frames", "Frames processed by the emotion detector, by outcome.", ("result",))
+EMOTION_SECONDS = Histogram("emotion_detect_seconds", "Decode + classify time per frame.")
+
+SERPER_REQUEST_SECONDS = Histogram("serper_request_seconds", "Upstream Serper request latency.", ("endpoint",))
+SERPER_ERRORS = Counter("serper_errors", "Failed upstream Serper requests.", ("endpoint",))
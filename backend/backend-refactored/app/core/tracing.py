@@ -0,0 +1,196 @@
+"""Lightweight request tracing.
+
+A middleware gives every request (or WebSocket connection) a trace id, and
+`span()` blocks inside the services record how long each stage took. Spans
+are appended as JSON lines to TRACE_FILE by a background writer thread; the
+context (trace id + parent span) follows asyncio tasks, `asyncio.to_thread`
+calls and worker-process hops.
+
+Aggregate a trace file into per-stage percentiles with:
+    python -m app.core.tracing traces.jsonl [--trace-prefix http]
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from app.core.config import settings
+
+_trace_id: ContextVar[str | None] = ContextVar("trace_id", default=None)
+_parent_span_id: ContextVar[str | None] = ContextVar("parent_span_id", default=None)
+
+# perf_counter() is what the hot paths measure with; convert to wall time once.
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+
+_records: "queue.SimpleQueue[dict]" = queue.SimpleQueue()
+_writer_started = False
+_writer_lock = threading.Lock()
+
+def _write_forever(path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as sink:
+        while True:
+            record = _records.get()
+            sink.write(json.dumps(record) + "\n")
+            # Drain whatever else piled up before flushing once.
+            while not _records.empty():
+                sink.write(json.dumps(_records.get()) + "\n")
+            sink.flush()
+
+def _emit(record: dict):
+    global _writer_started
+    if not _writer_started:
+        with _writer_lock:
+            if not _writer_started:
+                threading.Thread(target=_write_forever, args=(settings.TRACE_FILE,), daemon=True, name="trace-writer").start()
+                _writer_started = True
+    _records.put(record)
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+def current_context() -> tuple[str, str | None] | None:
+    """The (trace id, parent span id) pair to hand to another process."""
+    trace_id = _trace_id.get()
+    return (trace_id, _parent_span_id.get()) if trace_id else None
+
+@contextmanager
+def use_context(context: tuple[str, str | None] | None):
+    """Continues a trace received from another process."""
+    if not context:
+        yield
+        return
+    trace_token = _trace_id.set(context[0])
+    parent_token = _parent_span_id.set(context[1])
+    try:
+        yield
+    finally:
+        _parent_span_id.reset(parent_token)
+        _trace_id.reset(trace_token)
+
+def record_span(name: str, started: float, finished: float, **attrs):
+    """Records an already-measured stage (perf_counter timestamps) under the current trace."""
+    trace_id = _trace_id.get()
+    if trace_id is None or not settings.TRACING_ENABLED:
+        return
+    _emit({
+        "trace_id": trace_id,
+        "span_id": _new_id(),
+        "parent_id": _parent_span_id.get(),
+        "name": name,
+        "start": round(_EPOCH_OFFSET + started, 6),
+        "duration_ms": round((finished - started) * 1000, 3),
+        "attrs": attrs,
+    })
+
+@contextmanager
+def span(name: str, **attrs):
+    """Times the enclosed block as a child of the current span."""
+    trace_id = _trace_id.get()
+    if trace_id is None or not settings.TRACING_ENABLED:
+        yield
+        return
+
+    span_id = _new_id()
+    parent_id = _parent_span_id.get()
+    token = _parent_span_id.set(span_id)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        finished = time.perf_counter()
+        _parent_span_id.reset(token)
+        if error:
+            attrs["error"] = error
+        _emit({
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "name": name,
+            "start": round(_EPOCH_OFFSET + started, 6),
+            "duration_ms": round((finished - started) * 1000, 3),
+            "attrs": attrs,
+        })
+
+class TracingMiddleware:
+    """ASGI middleware that opens a root span per request and returns its X-Trace-Id."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-trace-id", b"").decode("latin-1")
+        trace_id = incoming if incoming.isalnum() and len(incoming) <= 64 else uuid.uuid4().hex
+        header = (b"x-trace-id", trace_id.encode())
+
+        async def send_with_trace_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [header]
+            await send(message)
+
+        token = _trace_id.set(trace_id)
+        try:
+            with span(f"{scope['type']} {scope.get('method', 'WS')} {scope['path']}"):
+                await self.app(scope, receive, send_with_trace_id)
+        finally:
+            _trace_id.reset(token)
+
+# --- Report CLI ---------------------------------------------------------------
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+def report(path: Path, trace_prefix: str | None = None) -> list[dict]:
+    """Per-stage count and latency percentiles from a JSONL trace file."""
+    spans = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    if trace_prefix:
+        roots = {s["trace_id"] for s in spans if s["parent_id"] is None and s["name"].startswith(trace_prefix)}
+        spans = [s for s in spans if s["trace_id"] in roots]
+
+    durations: dict[str, list[float]] = {}
+    for s in spans:
+        durations.setdefault(s["name"], []).append(s["duration_ms"])
+
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append({
+            "stage": name,
+            "count": len(values),
+            "p50_ms": _percentile(values, 50),
+            "p95_ms": _percentile(values, 95),
+            "p99_ms": _percentile(values, 99),
+            "max_ms": values[-1],
+        })
+    return sorted(rows, key=lambda row: row["p50_ms"] * row["count"], reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate a trace file into per-stage percentiles.")
+    parser.add_argument("trace_file", type=Path, nargs="?", default=settings.TRACE_FILE)
+    parser.add_argument("--trace-prefix", help="only traces whose root span starts with this, e.g. 'http POST /api/research'")
+    parser.add_argument("--json", action="store_true", help="print rows as JSON")
+    args = parser.parse_args()
+
+    rows = report(args.trace_file, args.trace_prefix)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'stage':<48} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for row in rows:
+        print(f"{row['stage'][:48]:<48} {row['count']:>6} {row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f} {row['p99_ms']:>10.1f} {row['max_ms']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
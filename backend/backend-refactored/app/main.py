@@ -2,14 +2,23 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager  # <-- 1. Import the context manager
 
 from app.core.config import settings
-from app.services import ai_service, emotion_service, audio_service
-from app.api.routers import ai_processing, audio, emotion, external_search, utility, proxy
+from app.core import metrics, tracing
+from app.services import ai_service, emotion_service, audio_service, keyword_service, screenshot_service
+from app.services.model_registry import ModelRegistry
+from app.workers.client import WorkerPool
+from app.workers.roles import ensure_private_dir, socket_dir, socket_path
+from app.api.routers import ai_processing, audio, bundle, emotion, external_search, images, keywords, utility, proxy, gateway, admin
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
 
+GATEWAY_MODE = settings.DEPLOYMENT_MODE == "gateway"
+
 # 2. Define the lifespan manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -19,24 +28,57 @@ async def lifespan(app: FastAPI):
     settings.IMAGE_DIR.mkdir(parents=True, exist_ok=True)
     settings.TEMP_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Load models and store them in app.state
-    print("Loading Hugging Face models...")
-    app.state.hf_models = ai_service.load_hf_models()
-    print("Hugging Face models loaded and available.")
-
-    print("Loading emotion detector...")
-    app.state.emotion_detector = emotion_service.load_detector()
-    print("Emotion detector loaded and available.")
-
-    print("Loading Whisper model...")
-    app.state.whisper_model = audio_service.load_whisper_model()
-    print("Whisper model loaded and available.")
+    # Register models; they load concurrently in the background (or on first
+    # use when listed in LAZY_MODELS) so cheap endpoints are served right away.
+    registry = ModelRegistry()
+    # The keyword embedder is small enough to live in the gateway too.
+    registry.register("keywords", keyword_service.load_embedder, lazy="keywords" in settings.LAZY_MODELS, expected_load_seconds=15)
+    app.state.models = registry
+
+    if GATEWAY_MODE:
+        # Inference runs in separate worker processes; we only hold connections.
+        # Replies are unpickled, so refuse a socket dir anyone else could write to.
+        ensure_private_dir(socket_dir())
+        app.state.workers = {
+            role: WorkerPool(role, [socket_path(role, i) for i in range(count)])
+            for role, count in settings.WORKER_REPLICAS.items()
+        }
+    else:
+        registry.register("llm", ai_service.load_llm_backends, lazy="llm" in settings.LAZY_MODELS, expected_load_seconds=120)
+        registry.register("emotion", emotion_service.load_detector, lazy="emotion" in settings.LAZY_MODELS, expected_load_seconds=20)
+        registry.register("whisper", audio_service.load_whisper_model, lazy="whisper" in settings.LAZY_MODELS, expected_load_seconds=60)
+        app.state.vision_client = ai_service.create_vision_client()
+
+    registry.start()
+
+    app.state.browser_pool = screenshot_service.BrowserPool(settings.SCREENSHOT_POOL_SIZE, settings.SCREENSHOT_MAX_USES)
+    if settings.SCREENSHOT_PREWARM:
+        app.state.browser_warmup = asyncio.create_task(asyncio.to_thread(app.state.browser_pool.warm))
+
+    # Pillow releases the GIL while resizing and encoding, so threads are enough here.
+    app.state.image_executor = ThreadPoolExecutor(settings.IMAGE_VARIANT_WORKERS, thread_name_prefix="image-variant")
+
+    app.state.vision_queue = ai_service.VisionQueue(
+        settings.VISION_MAX_CONCURRENCY, settings.VISION_MAX_QUEUE
+    )
+
+    # Queue depths are read at scrape time rather than tracked on every change.
+    vision_queue = app.state.vision_queue
+    metrics.QUEUE_DEPTH.labels("vision", "waiting").set_function(lambda: vision_queue.waiting)
+    metrics.QUEUE_DEPTH.labels("vision", "running").set_function(lambda: vision_queue.in_flight)
+    if GATEWAY_MODE:
+        for role, pool in app.state.workers.items():
+            metrics.QUEUE_DEPTH.labels(f"worker:{role}", "running").set_function(lambda pool=pool: sum(pool.in_flight))
     
     yield  # The application is now running
     
     # Code to run on shutdown
     print("--- Server Shutting Down ---")
-    # You can add cleanup code here if needed
+    app.state.browser_pool.close()
+    app.state.image_executor.shutdown(wait=False, cancel_futures=True)
+    if GATEWAY_MODE:
+        for pool in app.state.workers.values():
+            pool.close()
 
 
 # 3. Pass the lifespan manager to the FastAPI app
@@ -53,17 +95,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(tracing.TracingMiddleware)
+
 # Mount static files directory
 app.mount("/static/images", StaticFiles(directory=settings.IMAGE_DIR), name="images")
 
 # Include API routers
 api_prefix = "/api"
-app.include_router(ai_processing.router, prefix=api_prefix, tags=["AI Processing"])
-app.include_router(audio.router, prefix=api_prefix, tags=["Audio"])
-app.include_router(emotion.router, prefix=api_prefix, tags=["Emotion"])
+if GATEWAY_MODE:
+    app.include_router(gateway.router, prefix=api_prefix, tags=["Gateway"])
+else:
+    app.include_router(ai_processing.router, prefix=api_prefix, tags=["AI Processing"])
+    app.include_router(audio.router, prefix=api_prefix, tags=["Audio"])
+    app.include_router(emotion.router, prefix=api_prefix, tags=["Emotion"])
 app.include_router(external_search.router, prefix=api_prefix, tags=["External Search"])
+app.include_router(images.router, prefix=api_prefix, tags=["Images"])
+app.include_router(keywords.router, prefix=api_prefix, tags=["Keywords"])
+app.include_router(bundle.router, prefix=api_prefix, tags=["Research Bundle"])
 app.include_router(utility.router, prefix=api_prefix, tags=["Utility"])
 app.include_router(proxy.router, prefix=api_prefix, tags=["Proxy"])
+app.include_router(admin.router, prefix=api_prefix, tags=["Admin"])
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    families = metrics.collect()
+    if GATEWAY_MODE:
+        remote = {}
+        for role, pool in app.state.workers.items():
+            for replica, worker_families in (await pool.call_each("__metrics__")).items():
+                remote[f"{role}-{replica}"] = worker_families
+        families = metrics.merge(families, remote)
+    return PlainTextResponse(metrics.render(families), media_type="text/plain; version=0.0.4")
 
 # Root endpoint
 @app.get("/")
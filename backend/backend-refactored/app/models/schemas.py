@@ -1,16 +1,32 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 # AI Processing Schemas
 class ResearchQuery(BaseModel):
     question: str
     emotion: str
+    level: int | None = Field(None, ge=1, le=3)  # 1 beginner .. 3 advanced; None keeps the full-length answer
+
+class LocalLLMRequest(BaseModel):
+    query: str
+    mode: str = "learning"
+    level: int = Field(1, ge=1, le=3)
+    stream: bool = False
 
 class SummarizeRequest(BaseModel):
     content: str
 
+class SummarizeBatchRequest(BaseModel):
+    contents: list[str]
+
 class ImagePayload(BaseModel):
     image_data: str  # Base64 data URL
 
+# The search bar sends {question, emotion}; the image carousel sends {query}
+class KeywordRequest(BaseModel):
+    query: str | None = None
+    question: str | None = None
+    emotion: str | None = None
+
 # External Search Schemas
 class SerperQuery(BaseModel):
     q: str
@@ -1,11 +1,22 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
-import ollama
 from app.core.config import settings
-import os
+from app.core import tracing
+from app.services import compression_service, llm_backends, quantization
+from dataclasses import replace
+from typing import TYPE_CHECKING, Iterator
+import asyncio
+import math
+import time
+
+# torch, transformers and ollama are imported where they are used so that
+# processes which never generate text don't pay for them at import time.
+if TYPE_CHECKING:
+    import ollama
 
 def load_hf_models():
     """Loads and returns the Hugging Face tokenizer and models."""
+    import torch
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+
     device = "cuda" if torch.cuda.is_available() else "cpu"
     print(f"Using device: {device}")
     print(f"Loading Hugging Face model: {settings.HF_MODEL_ID}")
@@ -13,26 +24,98 @@ def load_hf_models():
     tokenizer = AutoTokenizer.from_pretrained(settings.HF_MODEL_ID)
     dtype = torch.float16 if device == "cuda" else torch.float32
 
-    model_research = AutoModelForCausalLM.from_pretrained(settings.HF_MODEL_ID, torch_dtype=dtype).to(device)
-    model_summarize = AutoModelForCausalLM.from_pretrained(settings.HF_MODEL_ID, torch_dtype=dtype).to(device)
+    def load_model():
+        model = AutoModelForCausalLM.from_pretrained(settings.HF_MODEL_ID, torch_dtype=dtype).to(device).eval()
+        if device != "cpu" or settings.LLM_QUANTIZATION == "none":
+            return model
+        try:
+            model, _ = quantization.quantize_for_cpu(tokenizer, model, settings.LLM_QUANTIZATION)
+            return model
+        except quantization.QuantizationRejected as e:
+            # The fp32 weights were modified in place; reload them untouched.
+            print(f"{e}; falling back to fp32")
+            return AutoModelForCausalLM.from_pretrained(settings.HF_MODEL_ID, torch_dtype=dtype).to(device).eval()
+
+    model_research = load_model()
+    model_summarize = load_model()
     
     print("Hugging Face models loaded.")
     return tokenizer, model_research, model_summarize, device
 
-def _clean_hf_output(decoded_text: str) -> str:
-    """Helper to extract the assistant's response."""
-    if "<|start_header_id|>assistant<|end_header_id|>" in decoded_text:
-        answer = decoded_text.split("<|start_header_id|>assistant<|end_header_id|>")[-1]
-    else:
-        answer = decoded_text
-    
-    if "<|eot_id|>" in answer:
-        answer = answer.split("<|eot_id|>")[0]
-        
-    return answer.strip()
+def load_draft_model(device: str):
+    """Loads LLM_DRAFT_MODEL_ID, the small assistant model for speculative decoding."""
+    import torch
+    from transformers import AutoModelForCausalLM
+
+    if not settings.LLM_DRAFT_MODEL_ID:
+        raise RuntimeError("LLM_DRAFT_MODEL_ID must be set when LLM_SPECULATIVE is 'draft'")
+    dtype = torch.float16 if device == "cuda" else torch.float32
+    draft = AutoModelForCausalLM.from_pretrained(settings.LLM_DRAFT_MODEL_ID, torch_dtype=dtype).to(device).eval()
+    draft.generation_config.num_assistant_tokens = settings.LLM_DRAFT_TOKENS
+    return draft
+
+def speculation_kwargs(device: str) -> dict:
+    """generate() kwargs for the configured LLM_SPECULATIVE mode."""
+    mode = settings.LLM_SPECULATIVE
+    if mode == "off":
+        return {}
+    if mode == "prompt-lookup":
+        # Drafts by copying n-grams from the prompt (question, scraped content).
+        return {"prompt_lookup_num_tokens": settings.LLM_PROMPT_LOOKUP_TOKENS}
+    if mode == "draft":
+        return {"assistant_model": load_draft_model(device)}
+    raise ValueError(f"Unknown LLM_SPECULATIVE mode '{mode}', expected 'off', 'draft' or 'prompt-lookup'")
+
+def load_llm_backends() -> dict:
+    """Builds the generation backend for each LLM role from RESEARCH_BACKEND / SUMMARIZE_BACKEND."""
+    kinds = {"research": settings.RESEARCH_BACKEND, "summarize": settings.SUMMARIZE_BACKEND}
+    for role, kind in kinds.items():
+        if kind not in llm_backends.BACKEND_KINDS:
+            raise ValueError(f"Unknown {role} backend '{kind}', expected one of {llm_backends.BACKEND_KINDS}")
+
+    used = set(kinds.values())
+    if "transformers" in used:
+        tokenizer, model_research, model_summarize, device = load_hf_models()
+        hf_models = {"research": model_research, "summarize": model_summarize}
+        speculation = speculation_kwargs(device)
+    llama = llm_backends.load_gguf_model() if "gguf" in used else None
+    client = llm_backends.create_ollama_client() if "ollama" in used else None
+
+    backends = {}
+    for role, kind in kinds.items():
+        if kind == "transformers":
+            backends[role] = llm_backends.TransformersBackend(tokenizer, hf_models[role], device, role, speculation)
+        elif kind == "gguf":
+            backends[role] = llm_backends.LlamaCppBackend(llama, role)
+        else:
+            backends[role] = llm_backends.OllamaBackend(client, role)
+    print(f"LLM backends: {kinds}")
+    return backends
+
+RESEARCH_PARAMS = llm_backends.GenerationParams(
+    max_new_tokens=1024,  # Increased for longer output
+    do_sample=True,
+    temperature=0.7,
+    top_p=0.9,
+    repetition_penalty=1.1,
+)
+SUMMARY_PARAMS = llm_backends.GenerationParams(max_new_tokens=200, repetition_penalty=1.1)
 
-def generate_research_response(tokenizer, model, device, question: str, emotion: str) -> str:
-    """Generates a response from the research model."""
+# Audience, length and style per learning level (1 beginner .. 3 advanced).
+LEVEL_STYLES = {
+    1: ("a beginner", "about 200 words", "Use simple words and everyday analogies, and avoid jargon."),
+    2: ("an intermediate learner", "about 350 words", "Introduce the key terms and show how the ideas connect."),
+    3: ("an advanced learner", "about 500–600 words", "Go into depth: mechanisms, nuances and worked examples."),
+}
+
+def research_params(level: int | None = None) -> llm_backends.GenerationParams:
+    """RESEARCH_PARAMS with the token budget of the learning level, if one is given."""
+    if level is None:
+        return RESEARCH_PARAMS
+    return replace(RESEARCH_PARAMS, max_new_tokens=settings.RESEARCH_LEVEL_TOKENS[level])
+
+def build_research_prompt(question: str, emotion: str, level: int | None = None) -> str:
+    """Builds the Llama 3 chat prompt for a research question."""
     if emotion.lower() in ["neutral", "sad"]:
         emotion_instruction = (
             "The user is in a calm or low mood, so explain the topic thoroughly but in a gentle and easy-to-follow manner."
@@ -46,73 +129,180 @@ def generate_research_response(tokenizer, model, device, question: str, emotion:
             "Adjust your response tone to suit the user's emotion. Prioritize clarity and depth."
         )
 
+    length = "about 500–600 words"
+    if level is not None:
+        audience, length, style = LEVEL_STYLES[level]
+        emotion_instruction = f"You are teaching {audience}. {style}\n{emotion_instruction}"
+
     dynamic_instruction = (
         f"You are a knowledgeable, friendly teacher who explains topics thoroughly.\n"
-        f"Always respond with a detailed, structured explanation of about 500–600 words.\n"
+        f"Always respond with a detailed, structured explanation of {length}.\n"
         f"Break the content into clear sections or paragraphs, and use examples when appropriate.\n"
         f"If the query is vague, ask for clarification before explaining.\n"
         f"{emotion_instruction}\n"
         f"Your tone should remain helpful, supportive, engaging, and educational."
     )
 
-    prompt = (
+    return (
         f"<|start_header_id|>system<|end_header_id|>\n{dynamic_instruction}<|eot_id|>\n"
         f"<|start_header_id|>user<|end_header_id|>\nQuery: {question}\nEmotion: {emotion}<|eot_id|>\n"
         f"<|start_header_id|>assistant<|end_header_id|>\n"
     )
-    
-    inputs = tokenizer(prompt, return_tensors="pt").to(device)
-    with torch.no_grad():
-        output = model.generate(
-            **inputs,
-            max_new_tokens=1024,  # Increased for longer output
-            do_sample=True,
-            temperature=0.7,
-            top_p=0.9,
-            repetition_penalty=1.1,
-            eos_token_id=tokenizer.eos_token_id
-        )
-    
-    decoded = tokenizer.decode(output[0], skip_special_tokens=False)
-    return _clean_hf_output(decoded)
+
+def generate_research_response(
+    backend, question: str, emotion: str, level: int | None = None, control: llm_backends.GenerationControl | None = None
+) -> str:
+    """Generates a response from the research backend."""
+    prompt = build_research_prompt(question, emotion, level)
+    control = control or llm_backends.GenerationControl.for_role("research")
+    return "".join(backend.generate(prompt, research_params(level), control)).strip()
+
+def build_lesson_prompt(query: str, level: int) -> str:
+    """Builds the Llama 3 chat prompt for a learning-mode lesson."""
+    audience, length, style = LEVEL_STYLES[level]
+    instruction = (
+        f"You are a patient tutor writing a short lesson for {audience}.\n"
+        f"Write {length} in Markdown with these sections: a '# ' title, '## Introduction', '## Key Concepts' "
+        f"(a numbered list), '## Example' and '## Summary'.\n"
+        f"{style}\nDo not add anything after the summary."
+    )
+    return (
+        f"<|start_header_id|>system<|end_header_id|>\n{instruction}<|eot_id|>\n"
+        f"<|start_header_id|>user<|end_header_id|>\nTopic: {query}<|eot_id|>\n"
+        f"<|start_header_id|>assistant<|end_header_id|>\n"
+    )
+
+def stream_lesson(backend, query: str, level: int, control: llm_backends.GenerationControl | None = None) -> Iterator[str]:
+    """Yields a learning-mode lesson as text deltas, on the research backend."""
+    control = control or llm_backends.GenerationControl.for_role("research")
+    yield from backend.generate(build_lesson_prompt(query, level), research_params(level), control)
+
+def generate_lesson(backend, query: str, level: int, control: llm_backends.GenerationControl | None = None) -> str:
+    return "".join(stream_lesson(backend, query, level, control)).strip()
 
 
-def generate_summary(tokenizer, model, device, content: str) -> str:
-    """Generates a summary from the summarize model."""
+# The summary prompt pre-fills the start of the assistant turn.
+SUMMARY_LEAD = "This article states that "
+
+def build_summary_prompt(content: str) -> str:
+    """Builds the Llama 3 chat prompt for summarizing `content`, compressed to the input budget."""
+    with tracing.span("compress", characters=len(content)):
+        content = compression_service.compress(content)
     instruction = (
         "You are an expert academic assistant.\nSummarize the given content in about 50 words, even if the given content is shorter, you have to make up some stuff and make about 50 words\n"
         "The summary must start with: 'This article states that'.\nWrite clearly and professionally. Do not add notes, opinions, or extra commentary, do not respond with bold text formatters or any other formatting.\n"
     )
-    prompt = f"<|start_header_id|>system<|end_header_id|>\n{instruction}<|eot_id|>\n<|start_header_id|>user<|end_header_id|>\n{content.strip()}<|eot_id|>\n<|start_header_id|>assistant<|end_header_id|>\nThis article states that "
-    
-    inputs = tokenizer(prompt, return_tensors="pt").to(device)
-    with torch.no_grad():
-        output = model.generate(**inputs, max_new_tokens=200, do_sample=False, temperature=0.7, top_p=0.9, repetition_penalty=1.1, eos_token_id=tokenizer.eos_token_id)
+    return f"<|start_header_id|>system<|end_header_id|>\n{instruction}<|eot_id|>\n<|start_header_id|>user<|end_header_id|>\n{content.strip()}<|eot_id|>\n<|start_header_id|>assistant<|end_header_id|>\n{SUMMARY_LEAD}"
 
-    decoded = tokenizer.decode(output[0], skip_special_tokens=False)
-    return _clean_hf_output(decoded)
+def stream_summary(backend, content: str, control: llm_backends.GenerationControl | None = None) -> Iterator[str]:
+    """Yields the summary as text deltas."""
+    prompt = build_summary_prompt(content)
+    control = control or llm_backends.GenerationControl.for_role("summarize")
+    # The prompt already opens the answer with SUMMARY_LEAD; keep it in the result.
+    yield SUMMARY_LEAD
+    yield from backend.generate(prompt, SUMMARY_PARAMS, control)
 
-def analyze_image_with_ollama(image_path: str) -> str:
-    """Analyzes an image using Ollama by sending image bytes."""
-    instruction = "answer the question shown in the image."
-    print(f"🤖 Analyzing {os.path.basename(image_path)} with model '{settings.OLLAMA_MODEL_NAME}'...")
-    
+def generate_summary(backend, content: str, control: llm_backends.GenerationControl | None = None) -> str:
+    """Generates a summary from the summarize backend."""
+    return "".join(stream_summary(backend, content, control)).strip()
+
+def summary_batch_control(count: int, parent: llm_backends.GenerationControl | None = None) -> llm_backends.GenerationControl:
+    """Deadline for summarizing `count` items: one summarize deadline per batch."""
+    rounds = math.ceil(count / settings.LLM_MAX_BATCH_SIZE)
+    return llm_backends.GenerationControl.for_role("summarize", rounds=rounds, parent=parent)
+
+def generate_summaries(backend, contents: list[str], control: llm_backends.GenerationControl | None = None) -> Iterator[tuple[int, str]]:
+    """Summarizes several contents, yielding (index, summary) in completion order."""
+    prompts = [build_summary_prompt(content) for content in contents]
+    control = control or llm_backends.GenerationControl.for_role("summarize")
+    if hasattr(backend, "generate_batch"):
+        results = backend.generate_batch(prompts, SUMMARY_PARAMS, control)
+    else:
+        # Engines without batching summarize one item at a time.
+        results = ((index, "".join(backend.generate(prompt, SUMMARY_PARAMS, control))) for index, prompt in enumerate(prompts))
+    for index, text in results:
+        yield index, (SUMMARY_LEAD + text).strip()
+
+VISION_INSTRUCTION = "answer the question shown in the image."
+
+class VisionSaturated(Exception):
+    """Raised when every vision slot is busy and the wait queue is full."""
+    def __init__(self, queue_position: int, eta_seconds: float):
+        super().__init__(f"Vision queue is full (position {queue_position}, ~{eta_seconds:.0f}s)")
+        self.queue_position = queue_position
+        self.eta_seconds = eta_seconds
+
+    def detail(self) -> dict:
+        return {"message": str(self), "queue_position": self.queue_position, "eta_seconds": round(self.eta_seconds, 1)}
+
+class VisionQueue:
+    """Bounds in-flight vision jobs and estimates the wait for queued ones."""
+    def __init__(self, max_concurrency: int, max_waiting: int, initial_job_seconds: float = 10.0):
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.in_flight = 0
+        self.waiting = 0
+        self.avg_job_seconds = initial_job_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def eta_seconds(self, queue_position: int) -> float:
+        """Estimated seconds until a job at this queue position starts running."""
+        rounds = math.ceil(queue_position / self.max_concurrency)
+        return rounds * self.avg_job_seconds
+
+    async def acquire(self) -> float:
+        """Waits for a free slot and returns the job start time."""
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            position = self.waiting + 1
+            raise VisionSaturated(position, self.eta_seconds(position))
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, started: float):
+        """Frees a slot and folds the job duration into the running average."""
+        self.in_flight -= 1
+        self._semaphore.release()
+        self.avg_job_seconds = 0.8 * self.avg_job_seconds + 0.2 * (time.monotonic() - started)
+
+def create_vision_client() -> "ollama.AsyncClient":
+    """Creates the pooled async client for the Ollama (or compatible) server."""
+    import httpx
+    import ollama
+
+    return ollama.AsyncClient(
+        host=settings.OLLAMA_HOST,
+        timeout=settings.VISION_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.VISION_MAX_CONCURRENCY + settings.VISION_MAX_QUEUE,
+            max_keepalive_connections=settings.VISION_MAX_CONCURRENCY,
+        ),
+    )
+
+def _vision_messages(image_bytes: bytes) -> list[dict]:
+    return [{'role': 'user', 'content': VISION_INSTRUCTION, 'images': [image_bytes]}]
+
+async def analyze_image_with_ollama(client: "ollama.AsyncClient", image_bytes: bytes, filename: str = "image") -> str:
+    """Analyzes preprocessed image bytes with the Ollama vision model."""
+    print(f"🤖 Analyzing {filename} with model '{settings.OLLAMA_MODEL_NAME}'...")
     try:
-        # Read the file content as bytes
-        with open(image_path, "rb") as f:
-            image_bytes = f.read()
-
-        # Call the model with the image bytes
-        response = ollama.chat(
-            model=settings.OLLAMA_MODEL_NAME,
-            messages=[{
-                'role': 'user', 
-                'content': instruction, 
-                'images': [image_bytes]  # <-- Pass the bytes directly
-            }]
-        )
+        with tracing.span("ollama_vision", image_bytes=len(image_bytes)):
+            response = await client.chat(model=settings.OLLAMA_MODEL_NAME, messages=_vision_messages(image_bytes))
         return response['message']['content']
     except Exception as e:
         # Re-raise the exception to be handled by the endpoint
         print(f"Error during Ollama analysis: {e}")
         raise e
+
+async def stream_image_analysis(client: "ollama.AsyncClient", image_bytes: bytes, filename: str = "image"):
+    """Yields the vision model's answer token by token."""
+    print(f"🤖 Streaming analysis of {filename} with model '{settings.OLLAMA_MODEL_NAME}'...")
+    stream = await client.chat(model=settings.OLLAMA_MODEL_NAME, messages=_vision_messages(image_bytes), stream=True)
+    async for chunk in stream:
+        content = chunk['message']['content']
+        if content:
+            yield content
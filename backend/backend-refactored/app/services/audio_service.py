@@ -1,31 +1,53 @@
-import whisper
+import asyncio
+import base64
+import re
 import subprocess
 import tempfile
 import os
+import time
+import wave
+from typing import AsyncIterator
 from app.core.config import settings
+from app.core import metrics, tracing
 
 def load_whisper_model():
     """Loads the Whisper model instance."""
+    import whisper
+
     print(f"Loading Whisper model: {settings.WHISPER_MODEL_SIZE}")
     model = whisper.load_model(settings.WHISPER_MODEL_SIZE)
     print("Whisper model loaded.")
     return model
 
+def _wav_duration(wav_file) -> float:
+    """Duration in seconds of a WAV file (path or file object)."""
+    with wave.open(wav_file, "rb") as wav:
+        return wav.getnframes() / float(wav.getframerate())
+
 async def transcribe_audio(model, audio_file):
-    """Saves, converts, and transcribes an audio file."""
+    """Reads an uploaded audio file and transcribes it off the event loop."""
+    contents = await audio_file.read()
+    return await asyncio.to_thread(transcribe_audio_bytes, model, contents)
+
+def transcribe_audio_bytes(model, contents: bytes) -> str:
+    """Saves, converts, and transcribes WebM audio bytes."""
     with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_webm:
-        contents = await audio_file.read()
         temp_webm.write(contents)
         webm_path = temp_webm.name
 
     wav_path = webm_path.replace(".webm", ".wav")
 
     try:
-        subprocess.run(
-            ["ffmpeg", "-y", "-i", webm_path, "-ar", "16000", "-ac", "1", wav_path],
-            check=True, capture_output=True, text=True
-        )
-        result = model.transcribe(wav_path)
+        with tracing.span("ffmpeg", input_bytes=len(contents)):
+            subprocess.run(
+                ["ffmpeg", "-y", "-i", webm_path, "-ar", "16000", "-ac", "1", wav_path],
+                check=True, capture_output=True, text=True
+            )
+        started = time.perf_counter()
+        with tracing.span("whisper"):
+            result = model.transcribe(wav_path)
+        metrics.WHISPER_WALL_SECONDS.inc(time.perf_counter() - started)
+        metrics.WHISPER_AUDIO_SECONDS.inc(_wav_duration(wav_path))
         return result["text"]
     finally:
         if os.path.exists(webm_path):
@@ -39,20 +61,95 @@ def generate_tts_audio(text: str) -> bytes:
         temp_wav_path = temp_wav.name
 
     try:
-        process = subprocess.Popen(
-            [settings.PIPER_EXECUTABLE, "--model", settings.PIPER_MODEL_PATH, "--output_file", temp_wav_path],
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-        )
-        process.stdin.write(text.encode())
-        process.stdin.close()
-        stdout, stderr = process.communicate()
+        started = time.perf_counter()
+        with tracing.span("piper", chars=len(text)):
+            process = subprocess.Popen(
+                [settings.PIPER_EXECUTABLE, "--model", settings.PIPER_MODEL_PATH, "--output_file", temp_wav_path],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            process.stdin.write(text.encode())
+            process.stdin.close()
+            stdout, stderr = process.communicate()
 
         if process.returncode != 0:
             raise RuntimeError(f"Piper error: {stderr.decode()}")
 
         with open(temp_wav_path, "rb") as f:
             audio_data = f.read()
+
+        audio_seconds = _wav_duration(temp_wav_path)
+        if audio_seconds > 0:
+            metrics.PIPER_REAL_TIME_FACTOR.observe((time.perf_counter() - started) / audio_seconds)
         return audio_data
     finally:
         if os.path.exists(temp_wav_path):
-            os.remove(temp_wav_path)
\ No newline at end of file
+            os.remove(temp_wav_path)
+
+class SentenceSplitter:
+    """Cuts streamed text into sentences as soon as each one is complete."""
+    _END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def push(self, delta: str) -> list[str]:
+        self._buffer += delta
+        sentences, start = [], 0
+        for match in self._END.finditer(self._buffer):
+            # Very short pieces ("e.g.", "Fig. 2.") are merged into the next sentence.
+            if match.end() - start >= self.min_chars:
+                sentences.append(self._buffer[start:match.end()].strip())
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> str:
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest
+
+async def _synthesize_locally(sentence: str) -> bytes:
+    return await asyncio.to_thread(generate_tts_audio, sentence)
+
+async def speak_text_stream(deltas: AsyncIterator[str], synthesize=_synthesize_locally) -> AsyncIterator[dict]:
+    """Relays text deltas and speaks each finished sentence while later text is still arriving.
+
+    Yields {"type": "text", "delta"} for every delta and, in sentence order,
+    {"type": "audio", "index", "text", "audio"} with base64 WAV from `synthesize`.
+    """
+    sentences = asyncio.Queue()
+    events = asyncio.Queue()
+
+    async def speaker():
+        index = 0
+        try:
+            while (sentence := await sentences.get()) is not None:
+                audio = await synthesize(sentence)
+                events.put_nowait({"type": "audio", "index": index, "text": sentence, "audio": base64.b64encode(audio).decode()})
+                index += 1
+        except Exception as e:
+            events.put_nowait({"type": "error", "detail": f"Speech synthesis failed: {e}"})
+        finally:
+            events.put_nowait(None)
+
+    speaker_task = asyncio.create_task(speaker())
+    splitter = SentenceSplitter()
+    speaker_done = False
+    try:
+        async for delta in deltas:
+            yield {"type": "text", "delta": delta}
+            for sentence in splitter.push(delta):
+                sentences.put_nowait(sentence)
+            # Pass on audio that is already ready without waiting for more.
+            while not speaker_done and not events.empty():
+                if (event := events.get_nowait()) is None:
+                    speaker_done = True
+                else:
+                    yield event
+        if tail := splitter.flush():
+            sentences.put_nowait(tail)
+        sentences.put_nowait(None)
+        while not speaker_done and (event := await events.get()) is not None:
+            yield event
+    finally:
+        speaker_task.cancel()
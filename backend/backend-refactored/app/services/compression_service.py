@@ -0,0 +1,96 @@
+from app.core.config import settings
+import math
+import re
+
+# Extractive compression: keep the most central sentences of a long text, in
+# their original order, so summarize prompts stay within a fixed token budget.
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by for from has have in is it its of on or that the this to was were which with "
+    "we our they their these those not can will also than then there such into more most other some".split()
+)
+
+def estimate_tokens(text: str) -> int:
+    """Rough Llama 3 token count (about four characters per token for English)."""
+    return math.ceil(len(text) / 4)
+
+def split_sentences(text: str) -> list[str]:
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+def score_sentences(sentences: list[str]):
+    """TextRank centrality of each sentence over TF-IDF cosine similarity."""
+    import numpy as np
+
+    vocabulary: dict[str, int] = {}
+    rows, cols = [], []
+    for row, sentence in enumerate(sentences):
+        for word in _WORD.findall(sentence.lower()):
+            if word not in _STOPWORDS:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    n = len(sentences)
+    if not vocabulary:
+        return np.ones(n)
+    counts = np.zeros((n, len(vocabulary)))
+    np.add.at(counts, (rows, cols), 1.0)
+
+    document_frequency = (counts > 0).sum(axis=0)
+    tfidf = counts * (np.log((1 + n) / (1 + document_frequency)) + 1)
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    tfidf /= np.where(norms == 0, 1, norms)
+
+    similarity = tfidf @ tfidf.T
+    np.fill_diagonal(similarity, 0)
+    out_weight = similarity.sum(axis=1, keepdims=True)
+    # Sentences sharing no words with the rest jump uniformly, like dangling pages.
+    transition = np.where(out_weight > 0, similarity / np.where(out_weight == 0, 1, out_weight), 1 / n)
+
+    damping = 0.85
+    scores = np.full(n, 1 / n)
+    for _ in range(50):
+        updated = (1 - damping) / n + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < 1e-6:
+            return updated
+        scores = updated
+    return scores
+
+def _select(sentences: list[str], token_budget: int, max_sentences: int | None = None) -> list[str]:
+    """Highest-scoring sentences that fit the budget, in original order."""
+    scores = score_sentences(sentences)
+    chosen, used = [], 0
+    for index in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+        if max_sentences is not None and len(chosen) >= max_sentences:
+            break
+        cost = estimate_tokens(sentences[index]) + 1
+        if used + cost <= token_budget:
+            chosen.append(index)
+            used += cost
+    return [sentences[i] for i in sorted(chosen)]
+
+def compress(text: str, token_budget: int | None = None) -> str:
+    """Extracts key sentences so `text` fits in about `token_budget` tokens (SUMMARY_INPUT_TOKEN_BUDGET by default)."""
+    token_budget = settings.SUMMARY_INPUT_TOKEN_BUDGET if token_budget is None else token_budget
+    text = text.strip()
+    if token_budget <= 0 or estimate_tokens(text) <= token_budget:
+        return text
+
+    sentences = split_sentences(text)
+    # Map-reduce for very long documents: the similarity matrix is quadratic in
+    # sentences, so compress fixed-size chunks first, then compress their extracts.
+    # Each chunk keeps at most half its sentences, so every round shrinks the text.
+    chunk = max(2, settings.COMPRESSION_CHUNK_SENTENCES)
+    while len(sentences) > chunk:
+        sentences = [
+            sentence
+            for start in range(0, len(sentences), chunk)
+            for sentence in _select(sentences[start:start + chunk], token_budget, chunk // 2)
+        ]
+
+    selected = _select(sentences, token_budget)
+    if not selected:
+        # Not even one sentence fits; fall back to a hard cut.
+        return text[:token_budget * 4]
+    return " ".join(selected)
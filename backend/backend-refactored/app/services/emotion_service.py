@@ -1,33 +1,62 @@
-from fer import FER
-import numpy as np
-import cv2
+from typing import TYPE_CHECKING
+import base64
+import time
+from app.core import metrics, tracing
+
+# fer pulls in TensorFlow; keep it (and cv2) out of module import time.
+if TYPE_CHECKING:
+    from fer import FER
+
+# Frames that produce no usable emotion count towards the skip rate.
+_FRAMES_DETECTED = metrics.EMOTION_FRAMES.labels("detected")
+_FRAMES_NO_FACE = metrics.EMOTION_FRAMES.labels("no_face")
+_FRAMES_INVALID = metrics.EMOTION_FRAMES.labels("invalid")
+_FRAMES_ERROR = metrics.EMOTION_FRAMES.labels("error")
+_DETECT_SECONDS = metrics.EMOTION_SECONDS.labels()
+
+def decode_data_url(data_url: str) -> bytes:
+    """Decodes the base64 payload of a `data:image/...;base64,` URL."""
+    return base64.b64decode(data_url.split(",")[1])
 
 def load_detector():
     """Loads the FER model instance."""
+    from fer import FER
+
     print("Loading FER model...")
     return FER()
 
-def detect_emotion_from_bytes(detector: FER, image_bytes: bytes):
+def detect_emotion_from_bytes(detector: "FER", image_bytes: bytes):
     """Detects emotion from an image provided as bytes."""
+    import cv2
+    import numpy as np
+
+    started = time.perf_counter()
     try:
         np_arr = np.frombuffer(image_bytes, np.uint8)
         image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
 
         if image is None:
+            _FRAMES_INVALID.inc()
             return {"emotion": None, "score": 0.0, "message": "Invalid image"}
 
-        top_emotion = detector.top_emotion(image)
+        with tracing.span("fer"):
+            top_emotion = detector.top_emotion(image)
 
         if not top_emotion or top_emotion[0] is None:
+            _FRAMES_NO_FACE.inc()
             return {"emotion": None, "score": 0.0, "message": "No face detected"}
 
         emotion, score = top_emotion
+        _FRAMES_DETECTED.inc()
         print(f"Detected emotion: {emotion} with score: {score}")
         if(emotion != "happy"):
             emotion = "neutral"  
         return {"emotion": emotion, "score": float(score)}
 
     except Exception as e:
+        _FRAMES_ERROR.inc()
         print(f"Error during emotion detection: {e}")
         # In a real app, you might return a more specific error
-        return {"emotion": "error", "score": 0.0, "message": str(e)}
\ No newline at end of file
+        return {"emotion": "error", "score": 0.0, "message": str(e)}
+    finally:
+        _DETECT_SECONDS.observe(time.perf_counter() - started)
@@ -1,24 +1,92 @@
+import json
 import requests
+import time
+import uuid
 from app.core.config import settings
+from app.core import metrics, tracing
 
-def search_serper_scholar(query: str):
-    """Performs a scholar search using the Serper.dev API."""
+def _post_serper(endpoint: str, payload: dict):
+    """POSTs to a Serper endpoint, recording upstream latency and errors."""
     headers = {
         'X-API-KEY': settings.SERPER_API_KEY,
         'Content-Type': 'application/json'
     }
-    payload = {"q": query}
-    response = requests.post("https://google.serper.dev/scholar", headers=headers, json=payload)
-    response.raise_for_status()
+    started = time.perf_counter()
+    try:
+        with tracing.span("serper", endpoint=endpoint):
+            response = requests.post(f"https://google.serper.dev/{endpoint}", headers=headers, json=payload)
+            response.raise_for_status()
+    except requests.RequestException:
+        metrics.SERPER_ERRORS.labels(endpoint).inc()
+        raise
+    finally:
+        metrics.SERPER_REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - started)
     return response.json()
 
+# Per-result fields the ScholarTiles / ImageSearchTiles components read.
+SCHOLAR_FIELDS = ("title", "link", "snippet", "abstract", "publicationInfo", "year", "citedBy", "pdfUrl", "id")
+LENS_FIELDS = ("title", "source", "link", "imageUrl", "thumbnailUrl")
+SEARCH_PARAMETER_FIELDS = ("q", "url", "type", "engine")
+
+def project_results(result: dict, fields: tuple[str, ...], limit: int | None = None) -> dict:
+    """Trims a Serper payload to the fields the frontend renders."""
+    parameters = result.get("searchParameters") or {}
+    return {
+        "searchParameters": {key: parameters[key] for key in SEARCH_PARAMETER_FIELDS if key in parameters},
+        "organic": [
+            {key: item[key] for key in fields if key in item}
+            for item in (result.get("organic") or [])[:limit]
+        ],
+        "credits": result.get("credits"),
+    }
+
+def project_scholar(result: dict) -> dict:
+    return project_results(result, SCHOLAR_FIELDS)
+
+def project_lens(result: dict) -> dict:
+    return project_results(result, LENS_FIELDS, settings.SERPER_LENS_MAX_RESULTS)
+
+def search_serper_scholar(query: str):
+    """Performs a scholar search using the Serper.dev API."""
+    return _post_serper("scholar", {"q": query})
+
+def search_serper_images(query: str):
+    """Performs an image search using the Serper.dev API."""
+    return _post_serper("images", {"q": query})
+
+def image_urls_for_keywords(keywords: list[str]) -> list[str]:
+    """Image URLs for a keyword query, at most KEYWORD_IMAGE_COUNT of them."""
+    results = search_serper_images(" ".join(keywords))
+    images = [image["imageUrl"] for image in results.get("images", []) if image.get("imageUrl")]
+    return images[:settings.KEYWORD_IMAGE_COUNT]
+
 def search_serper_lens(image_url: str):
     """Performs a reverse image search using the Serper.dev Lens API."""
-    headers = {
-        'X-API-KEY': settings.SERPER_API_KEY,
-        'Content-Type': 'application/json'
-    }
-    payload = {"url": image_url}
-    response = requests.post("https://google.serper.dev/lens", headers=headers, json=payload)
-    response.raise_for_status()
-    return response.json()
\ No newline at end of file
+    return _post_serper("lens", {"url": image_url})
+
+def cached_lens_result(image_hash: str):
+    """The stored Lens result for an image hash, or None if missing or older than LENS_CACHE_TTL_SECONDS."""
+    path = settings.LENS_CACHE_DIR / f"{image_hash}.json"
+    try:
+        if time.time() - path.stat().st_mtime > settings.LENS_CACHE_TTL_SECONDS:
+            return None
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+def search_lens_by_hash(image_hash: str, image_url: str) -> tuple[dict, bool]:
+    """Lens search through the per-hash result cache; returns (result, cache_hit)."""
+    cached = cached_lens_result(image_hash)
+    if cached is not None:
+        return cached, True
+
+    result = search_serper_lens(image_url)
+    settings.LENS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = settings.LENS_CACHE_DIR / f"{image_hash}.json"
+    tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(result))
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return result, False
@@ -1,27 +1,75 @@
+import asyncio
+import hashlib
 import uuid
 import shutil
 from pathlib import Path
 from fastapi import UploadFile, Request, HTTPException
+from PIL import Image
 from app.core.config import settings
+from app.services import image_service
+
+# Stored extension per decoded format. The client's filename is never trusted:
+# /static/images would otherwise serve an uploaded .html or .svg as markup.
+IMAGE_SUFFIXES = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp", "GIF": ".gif"}
+
+def _image_suffix(path: Path) -> str:
+    """The extension for the image stored at `path`; 400/415 unless it decodes as a whitelisted format."""
+    try:
+        with Image.open(path) as img:
+            image_format = img.format
+            img.verify()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Upload is not a readable image: {e}")
+    if image_format not in IMAGE_SUFFIXES:
+        raise HTTPException(status_code=415, detail=f"Unsupported image format {image_format}")
+    return IMAGE_SUFFIXES[image_format]
 
 async def save_upload_file(request: Request, file: UploadFile) -> str:
     """Saves an uploaded image and returns its public URL."""
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Only image uploads are allowed")
 
-    suffix = Path(file.filename).suffix or ".jpg"
-    unique_name = f"{uuid.uuid4().hex}{suffix}"
-    dest_path = settings.IMAGE_DIR / unique_name
-
+    name = uuid.uuid4().hex
+    tmp_path = settings.IMAGE_DIR / f".{name}.part"
     try:
-        with dest_path.open("wb") as buffer:
+        with tmp_path.open("wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
+        unique_name = name + await asyncio.to_thread(_image_suffix, tmp_path)
+        tmp_path.replace(settings.IMAGE_DIR / unique_name)
     finally:
+        tmp_path.unlink(missing_ok=True)
         await file.close()
 
     public_url = str(request.base_url) + f"static/images/{unique_name}"
     return public_url
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+async def save_upload_hashed(file: UploadFile) -> tuple[Path, str]:
+    """Streams an uploaded image into the store under its content hash; returns (path, hash)."""
+    if not file.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="Only image uploads are allowed")
+
+    tmp_path = settings.IMAGE_DIR / f".{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    try:
+        with tmp_path.open("wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                buffer.write(chunk)
+        image_hash = digest.hexdigest()
+        suffix = await asyncio.to_thread(_image_suffix, tmp_path)
+        # Same bytes, same name: repeated scans of one worksheet are stored once.
+        dest_path = settings.IMAGE_DIR / f"{image_hash}{suffix}"
+        tmp_path.replace(dest_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+        await file.close()
+    return dest_path, image_hash
+
+def public_image_url(request: Request, image_path: Path) -> str:
+    return str(request.base_url) + "static/images/" + image_path.relative_to(settings.IMAGE_DIR).as_posix()
+
 def save_temp_file(file: UploadFile) -> str:
     """Saves an uploaded file to a temporary directory."""
     try:
@@ -31,4 +79,17 @@ def save_temp_file(file: UploadFile) -> str:
             shutil.copyfileobj(file.file, buffer)
         return temp_file_path
     finally:
-        file.file.close()
\ No newline at end of file
+        file.file.close()
+
+def lens_url_for(request: Request, image_url: str) -> str:
+    """Swaps one of our own uploaded images for its downscaled Lens derivative."""
+    static_prefix = str(request.base_url) + "static/images/"
+    if not image_url.startswith(static_prefix):
+        return image_url
+
+    image_path = (settings.IMAGE_DIR / image_url[len(static_prefix):]).resolve()
+    if image_path.parent != settings.IMAGE_DIR.resolve() or not image_path.is_file():
+        return image_url
+
+    derived_path = image_service.prepare_for_lens(image_path)
+    return static_prefix + derived_path.relative_to(settings.IMAGE_DIR).as_posix()
@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import io
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from PIL import Image, ImageOps
+from app.core.config import settings
+
+# Derivatives keyed by (content hash, max side, text mode); bounded LRU.
+_derivative_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_cache_lock = Lock()
+
+def content_hash(image_bytes: bytes) -> str:
+    """Returns the hex SHA-256 of the raw image bytes."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+def _render_derivative(image_bytes: bytes, max_side: int, text_mode: bool) -> bytes:
+    """Decodes once, auto-orients, downscales and re-encodes an image as JPEG."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        source_format, source_size = img.format, img.size
+        needs_rotation = img.getexif().get(0x0112, 1) != 1  # EXIF Orientation tag
+        # Let the JPEG decoder do a cheap DCT-domain reduction before full decode.
+        img.draft("RGB", (max_side, max_side))
+        oriented = ImageOps.exif_transpose(img)
+        changed = needs_rotation or img.size != source_size
+
+        if max(oriented.size) > max_side:
+            oriented.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            changed = True
+
+        if text_mode:
+            oriented = ImageOps.autocontrast(ImageOps.grayscale(oriented), cutoff=1)
+            changed = True
+        elif oriented.mode not in ("RGB", "L"):
+            oriented = oriented.convert("RGB")
+            changed = True
+
+        # Already small, upright and compact: keep the original bytes.
+        if not changed and source_format == "JPEG":
+            return image_bytes
+
+        buffer = io.BytesIO()
+        oriented.save(buffer, format="JPEG", quality=settings.IMAGE_JPEG_QUALITY)
+        return buffer.getvalue()
+
+def preprocess_image(image_bytes: bytes, max_side: int, text_mode: bool = False) -> bytes:
+    """Returns a compact derivative of the image, cached by content hash."""
+    key = (content_hash(image_bytes), max_side, text_mode)
+    with _cache_lock:
+        cached = _derivative_cache.get(key)
+        if cached is not None:
+            _derivative_cache.move_to_end(key)
+            return cached
+
+    derivative = _render_derivative(image_bytes, max_side, text_mode)
+
+    with _cache_lock:
+        _derivative_cache[key] = derivative
+        while len(_derivative_cache) > settings.IMAGE_CACHE_SIZE:
+            _derivative_cache.popitem(last=False)
+    return derivative
+
+def prepare_for_vision(image_bytes: bytes, text_mode: bool | None = None) -> bytes:
+    """Prepares an image for the vision model's effective input resolution."""
+    if text_mode is None:
+        text_mode = settings.VISION_TEXT_MODE
+    return preprocess_image(image_bytes, settings.VISION_MAX_SIDE, text_mode)
+
+def prepare_for_lens(image_path: Path, image_hash: str | None = None) -> Path:
+    """Writes (once) a downscaled copy of a stored image for Lens search and returns its path."""
+    image_bytes = None
+    if image_hash is None:
+        image_bytes = image_path.read_bytes()
+        image_hash = content_hash(image_bytes)
+    derived_dir = settings.IMAGE_DIR / "derived"
+    derived_path = derived_dir / f"{image_hash}.jpg"
+    if derived_path.exists():
+        return derived_path
+
+    if image_bytes is None:
+        image_bytes = image_path.read_bytes()
+    derived_dir.mkdir(parents=True, exist_ok=True)
+    derivative = preprocess_image(image_bytes, settings.LENS_MAX_SIDE)
+    tmp_path = derived_path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    try:
+        tmp_path.write_bytes(derivative)
+        tmp_path.replace(derived_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return derived_path
+
+VARIANT_MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+_inflight_variants: dict[Path, asyncio.Future] = {}
+
+def variant_width(requested: int) -> int:
+    """Snaps a requested width up to the nearest configured step so the cache stays small."""
+    widths = sorted(settings.IMAGE_VARIANT_WIDTHS)
+    return next((w for w in widths if w >= requested), widths[-1])
+
+def variant_path(source: Path, width: int, fmt: str) -> Path:
+    return source.parent / "variants" / f"{source.stem}.w{width}.{fmt}"
+
+def variant_etag(source: Path, width: int, fmt: str) -> str:
+    """Strong ETag: changes whenever the original or the encoder settings change."""
+    stat = source.stat()
+    quality = settings.IMAGE_WEBP_QUALITY if fmt == "webp" else settings.IMAGE_JPEG_QUALITY
+    key = f"{source.name}:{stat.st_size}:{stat.st_mtime_ns}:{width}:{fmt}:{quality}"
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+def render_variant(source: Path, dest: Path, width: int, fmt: str):
+    """Decodes, auto-orients and downscales `source` to at most `width` wide, writing `dest` atomically."""
+    with Image.open(source) as img:
+        img.draft("RGB", (width, width))
+        oriented = ImageOps.exif_transpose(img)
+        if oriented.width > width:
+            oriented.thumbnail((width, oriented.height), Image.Resampling.LANCZOS)
+        keep_alpha = fmt == "webp" and oriented.mode in ("RGBA", "LA", "P")
+        oriented = oriented.convert("RGBA" if keep_alpha else "RGB")
+
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dest.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        try:
+            if fmt == "webp":
+                oriented.save(tmp_path, format="WEBP", quality=settings.IMAGE_WEBP_QUALITY, method=4)
+            else:
+                oriented.save(tmp_path, format="JPEG", quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+            tmp_path.replace(dest)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+async def ensure_variant(executor, source: Path, width: int, fmt: str) -> Path:
+    """Returns the cached variant, rendering it on `executor` once even under concurrent requests."""
+    dest = variant_path(source, width, fmt)
+    if dest.exists() and dest.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+        return dest
+
+    future = _inflight_variants.get(dest)
+    if future is None:
+        future = asyncio.get_running_loop().run_in_executor(executor, render_variant, source, dest, width, fmt)
+        _inflight_variants[dest] = future
+        future.add_done_callback(lambda _: _inflight_variants.pop(dest, None))
+    # Shielded so one client disconnecting does not cancel a render others are waiting on.
+    await asyncio.shield(future)
+    return dest
@@ -0,0 +1,79 @@
+import re
+from collections import OrderedDict
+from threading import Lock
+from app.core.config import settings
+
+# KeyBERT-style extraction: embed the text and its candidate n-grams in one
+# batch, rank candidates by cosine similarity to the text, diversify with MMR.
+
+# Keywords keyed by normalized text; bounded LRU.
+_keyword_cache: "OrderedDict[str, list[str]]" = OrderedDict()
+_cache_lock = Lock()
+
+_WORD = re.compile(r"[A-Za-z0-9][A-Za-z0-9+\-']*")
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by can could do does did for from has have how i if in into is it its me my of on "
+    "or our so such than that the their them then there these they this those to was we were what when where which "
+    "who whom why will with would you your about explain tell show describe please give define meaning".split()
+)
+
+def load_embedder():
+    """Loads the sentence-embedding model used for keyword ranking."""
+    from sentence_transformers import SentenceTransformer
+
+    print(f"Loading keyword model: {settings.KEYWORD_MODEL_ID}")
+    return SentenceTransformer(settings.KEYWORD_MODEL_ID, device="cpu")
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def candidate_phrases(text: str, max_ngram: int = 2) -> list[str]:
+    """Unique 1..max_ngram-word phrases that neither start nor end with a stopword."""
+    words = _WORD.findall(text.lower())
+    seen = {}
+    for size in range(1, max_ngram + 1):
+        for start in range(len(words) - size + 1):
+            gram = words[start:start + size]
+            if gram[0] in _STOPWORDS or gram[-1] in _STOPWORDS or len(gram[0]) < 2:
+                continue
+            seen.setdefault(" ".join(gram), None)
+    return list(seen)
+
+def extract_keywords(model, text: str, top_n: int | None = None, diversity: float | None = None) -> list[str]:
+    """Ranks candidate phrases by similarity to `text`, picking diverse ones with maximal marginal relevance."""
+    import numpy as np
+
+    top_n = top_n or settings.KEYWORD_TOP_N
+    diversity = settings.KEYWORD_DIVERSITY if diversity is None else diversity
+    candidates = candidate_phrases(text)
+    if not candidates:
+        return [text.strip()] if text.strip() else []
+
+    embeddings = model.encode([text] + candidates, batch_size=64, normalize_embeddings=True, convert_to_numpy=True)
+    document, phrases = embeddings[0], embeddings[1:]
+    relevance = phrases @ document
+    redundancy = phrases @ phrases.T
+
+    selected = [int(np.argmax(relevance))]
+    for _ in range(min(top_n, len(candidates)) - 1):
+        score = (1 - diversity) * relevance - diversity * redundancy[:, selected].max(axis=1)
+        score[selected] = -np.inf
+        selected.append(int(np.argmax(score)))
+    return [candidates[i] for i in selected]
+
+def cached_keywords(model, text: str) -> list[str]:
+    """extract_keywords with a per-normalized-text LRU in front of it."""
+    key = normalize(text)
+    with _cache_lock:
+        cached = _keyword_cache.get(key)
+        if cached is not None:
+            _keyword_cache.move_to_end(key)
+            return cached
+
+    keywords = extract_keywords(model, key)
+
+    with _cache_lock:
+        _keyword_cache[key] = keywords
+        while len(_keyword_cache) > settings.KEYWORD_CACHE_SIZE:
+            _keyword_cache.popitem(last=False)
+    return keywords
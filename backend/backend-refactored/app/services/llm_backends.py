@@ -0,0 +1,460 @@
+from app.core.config import settings
+from app.core import metrics, tracing
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+
+# Every backend exposes generate(prompt, params) -> iterator of text deltas.
+# Prompts arrive already rendered with the Llama 3 chat template.
+BACKEND_KINDS = ("transformers", "gguf", "ollama")
+
+@dataclass(frozen=True)
+class GenerationParams:
+    max_new_tokens: int
+    do_sample: bool = False
+    temperature: float = 0.7
+    top_p: float = 0.9
+    repetition_penalty: float = 1.1
+    # Llama 3 end-of-turn / end-of-message / end-of-text markers
+    stop: tuple[str, ...] = ("<|eot_id|>", "<|eom_id|>", "<|end_of_text|>")
+
+class GenerationControl:
+    """Lets the caller stop a running generation: explicit cancellation or a wall-clock deadline.
+
+    A control with a `parent` also stops once the parent does.
+    """
+    def __init__(self, timeout: float | None = None, parent: "GenerationControl | None" = None):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.parent = parent
+        self.reason = None
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def for_role(cls, role: str, rounds: int = 1, parent: "GenerationControl | None" = None) -> "GenerationControl":
+        """Uses the role's deadline, scaled by `rounds` sequential generations (e.g. batches)."""
+        timeout = settings.LLM_DEADLINE_SECONDS.get(role)
+        return cls(timeout * rounds if timeout else None, parent)
+
+    def cancel(self, reason: str = "cancelled"):
+        if self.reason is None:
+            self.reason = reason
+        self._cancelled.set()
+
+    def should_stop(self) -> bool:
+        if self._cancelled.is_set():
+            return True
+        if self.parent is not None and self.parent.should_stop():
+            self.cancel(self.parent.reason or "cancelled")
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+            return True
+        return False
+
+class GenerationTimer:
+    """Generation streamer that only timestamps tokens, splitting prefill from decode time."""
+    def __init__(self, role: str):
+        self.role = role
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.new_tokens = 0
+        self._prompt_seen = False
+
+    def put(self, value):
+        # generate() hands the prompt ids over first, then one token per step.
+        if not self._prompt_seen:
+            self._prompt_seen = True
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        # Assisted generation can accept several drafted tokens in one step.
+        self.new_tokens += 1 if value is None else value.numel()
+
+    def end(self):
+        if self.first_token_at is None:
+            return
+        finished = time.perf_counter()
+        decode_seconds = finished - self.first_token_at
+        tracing.record_span("prefill", self.started, self.first_token_at, role=self.role)
+        tracing.record_span("decode", self.first_token_at, finished, role=self.role, new_tokens=self.new_tokens)
+        metrics.LLM_PREFILL_SECONDS.labels(self.role).observe(self.first_token_at - self.started)
+        metrics.LLM_DECODE_SECONDS.labels(self.role).observe(decode_seconds)
+        metrics.LLM_GENERATED_TOKENS.labels(self.role).inc(self.new_tokens)
+        if self.new_tokens > 1 and decode_seconds > 0:
+            metrics.LLM_DECODE_TOKENS_PER_SECOND.labels(self.role).observe((self.new_tokens - 1) / decode_seconds)
+
+class _TokenStreamer(GenerationTimer):
+    """GenerationTimer that also hands new token ids to the consuming thread."""
+    def __init__(self, role: str):
+        super().__init__(role)
+        self._queue = queue.Queue()
+
+    def put(self, value):
+        is_prompt = not self._prompt_seen
+        super().put(value)
+        if not is_prompt:
+            self._queue.put(value.reshape(-1).tolist())
+
+    def end(self):
+        super().end()
+        self._queue.put(None)
+
+    def fail(self, error: Exception):
+        self._queue.put(error)
+
+    def __iter__(self) -> Iterator[list[int]]:
+        while (item := self._queue.get()) is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+class IncrementalDetokenizer:
+    """Turns a growing list of generated token ids into text deltas.
+
+    Only a short window of trailing ids is decoded per step: the ids since the
+    last emitted delta plus the ones before them, which byte-level BPE needs to
+    merge correctly. Deltas that would end inside a multi-byte UTF-8 character
+    (decoded as U+FFFD) are held back until the following token completes it.
+    """
+    def __init__(self, tokenizer, skip_special_tokens: bool = True):
+        self.tokenizer = tokenizer
+        self.skip_special_tokens = skip_special_tokens
+        self.ids: list[int] = []
+        self._prefix_offset = 0
+        self._read_offset = 0
+
+    def _decode(self, ids: list[int]) -> str:
+        return self.tokenizer.decode(ids, skip_special_tokens=self.skip_special_tokens)
+
+    def push(self, new_ids: list[int]) -> str:
+        """Adds token ids and returns the newly completed text ("" if none yet)."""
+        self.ids.extend(new_ids)
+        prefix_text = self._decode(self.ids[self._prefix_offset:self._read_offset])
+        new_text = self._decode(self.ids[self._prefix_offset:])
+        if len(new_text) <= len(prefix_text) or new_text.endswith("\ufffd"):
+            return ""
+        self._prefix_offset = self._read_offset
+        self._read_offset = len(self.ids)
+        return new_text[len(prefix_text):]
+
+    def flush(self) -> str:
+        """Returns whatever is still held back, partial characters included."""
+        prefix_text = self._decode(self.ids[self._prefix_offset:self._read_offset])
+        new_text = self._decode(self.ids[self._prefix_offset:])
+        self._prefix_offset = self._read_offset = len(self.ids)
+        return new_text[len(prefix_text):]
+
+def _start_thread(target) -> threading.Thread:
+    """Starts `target` on a daemon thread that keeps the caller's trace context."""
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(target,), daemon=True)
+    thread.start()
+    return thread
+
+@contextmanager
+def _active(role: str, control: GenerationControl):
+    gauge = metrics.LLM_ACTIVE_GENERATIONS.labels(role)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+        if control.reason:
+            metrics.LLM_STOPPED_GENERATIONS.labels(role, control.reason).inc()
+
+def _stopping_criteria(control: GenerationControl, on_step=None):
+    """A generate() stopping criterion that polls `control` once per decode step.
+
+    `on_step(input_ids)`, if given, sees the sequences after every step.
+    """
+    import torch
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class ControlCriteria(StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            if on_step is not None:
+                on_step(input_ids)
+            return torch.full((input_ids.shape[0],), control.should_stop(), dtype=torch.bool, device=input_ids.device)
+
+    return StoppingCriteriaList([ControlCriteria()])
+
+class TransformersBackend:
+    """Hugging Face generate() on an in-process model.
+
+    `speculation` holds extra generate() kwargs for assisted decoding
+    (assistant_model or prompt_lookup_num_tokens); the main model verifies
+    every drafted token, so the output distribution is unchanged.
+    """
+    kind = "transformers"
+
+    def __init__(self, tokenizer, model, device: str, role: str, speculation: dict | None = None):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.device = device
+        self.role = role
+        self.speculation = speculation or {}
+
+    def _stop_token_ids(self, params: GenerationParams) -> list[int]:
+        ids = {self.tokenizer.eos_token_id}
+        for marker in params.stop:
+            token_id = self.tokenizer.convert_tokens_to_ids(marker)
+            if token_id is not None and token_id != self.tokenizer.unk_token_id:
+                ids.add(token_id)
+        return sorted(ids)
+
+    def _generate_kwargs(self, params: GenerationParams) -> dict:
+        kwargs = {
+            "max_new_tokens": params.max_new_tokens,
+            "repetition_penalty": params.repetition_penalty,
+            "eos_token_id": self._stop_token_ids(params),
+            "do_sample": params.do_sample,
+        }
+        if params.do_sample:
+            kwargs.update(temperature=params.temperature, top_p=params.top_p)
+        kwargs.update(self.speculation)
+        return kwargs
+
+    def generate(self, prompt: str, params: GenerationParams, control: GenerationControl | None = None) -> Iterator[str]:
+        import torch
+
+        control = control or GenerationControl()
+        with tracing.span("tokenize", role=self.role):
+            inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
+        streamer = _TokenStreamer(self.role)
+
+        def run():
+            try:
+                with _active(self.role, control), torch.no_grad():
+                    self.model.generate(
+                        **inputs,
+                        streamer=streamer,
+                        stopping_criteria=_stopping_criteria(control),
+                        **self._generate_kwargs(params),
+                    )
+            except Exception as e:
+                streamer.fail(e)
+
+        # generate() blocks until done, so it runs beside us and streams ids back.
+        thread = _start_thread(run)
+
+        try:
+            # Only generated ids reach the streamer; the prompt is never decoded.
+            detokenizer = IncrementalDetokenizer(self.tokenizer)
+            for new_ids in streamer:
+                if delta := detokenizer.push(new_ids):
+                    yield delta
+            if tail := detokenizer.flush():
+                yield tail
+        finally:
+            # The consumer stopped reading (or failed): stop decoding for it too.
+            if thread.is_alive():
+                control.cancel("abandoned")
+            thread.join()
+
+    def generate_batch(
+        self, prompts: list[str], params: GenerationParams, control: GenerationControl | None = None
+    ) -> Iterator[tuple[int, str]]:
+        """Generates for several prompts at once, yielding (index, text) as each sequence finishes.
+
+        Prompts are sorted by token length and run in left-padded batches of at
+        most LLM_MAX_BATCH_SIZE, so rows in a batch carry little padding.
+        """
+        control = control or GenerationControl()
+        with tracing.span("tokenize", role=self.role, batch=len(prompts)):
+            encoded = [self.tokenizer(prompt)["input_ids"] for prompt in prompts]
+        order = sorted(range(len(prompts)), key=lambda i: len(encoded[i]))
+        for start in range(0, len(order), settings.LLM_MAX_BATCH_SIZE):
+            if control.should_stop():
+                return
+            bucket = order[start:start + settings.LLM_MAX_BATCH_SIZE]
+            yield from self._generate_bucket([(i, encoded[i]) for i in bucket], params, control)
+
+    def _generate_bucket(self, rows: list[tuple[int, list[int]]], params: GenerationParams, control: GenerationControl):
+        import torch
+
+        stop_ids = set(self._stop_token_ids(params))
+        pad_id = self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None else self.tokenizer.eos_token_id
+        width = max(len(ids) for _, ids in rows)
+        input_ids = torch.full((len(rows), width), pad_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(rows), width), dtype=torch.long)
+        for row, (_, ids) in enumerate(rows):
+            input_ids[row, width - len(ids):] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, width - len(ids):] = 1
+
+        results = queue.Queue()
+        finished = set()
+
+        def finish(row: int, generated_ids: list[int]):
+            finished.add(row)
+            results.put((rows[row][0], self.tokenizer.decode(generated_ids, skip_special_tokens=True)))
+
+        def on_step(sequences):
+            for row, token_id in enumerate(sequences[:, -1].tolist()):
+                if row not in finished and token_id in stop_ids:
+                    finish(row, sequences[row, width:].tolist())
+
+        # Assisted decoding only supports a single sequence, so batches skip it.
+        kwargs = {key: value for key, value in self._generate_kwargs(params).items() if key not in self.speculation}
+
+        def run():
+            try:
+                with _active(self.role, control), torch.no_grad():
+                    output = self.model.generate(
+                        input_ids=input_ids.to(self.device),
+                        attention_mask=attention_mask.to(self.device),
+                        pad_token_id=pad_id,
+                        streamer=GenerationTimer(self.role),
+                        stopping_criteria=_stopping_criteria(control, on_step),
+                        **kwargs,
+                    )
+                # Rows that hit max_new_tokens (or were cut short) never saw a stop token.
+                for row in range(len(rows)):
+                    if row not in finished:
+                        finish(row, output[row, width:].tolist())
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(None)
+
+        thread = _start_thread(run)
+        try:
+            while (item := results.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if thread.is_alive():
+                control.cancel("abandoned")
+            thread.join()
+
+async def iterate_in_thread(iterator: Iterator, control: GenerationControl):
+    """Drains a blocking generation iterator on a worker thread, yielding its items on the event loop.
+
+    If the consumer stops early (e.g. the client disconnected), the generation is cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue()
+    done = object()
+
+    def drain():
+        try:
+            for item in iterator:
+                loop.call_soon_threadsafe(items.put_nowait, item)
+        except Exception as e:
+            loop.call_soon_threadsafe(items.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(items.put_nowait, done)
+
+    drained = False
+    worker = asyncio.ensure_future(asyncio.to_thread(drain))
+    try:
+        while (item := await items.get()) is not done:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        drained = True
+        await worker
+    finally:
+        if not drained:
+            control.cancel("disconnected")
+
+# A llama.cpp context holds one KV cache, so generations on it are serialized.
+_GGUF_LOCK = threading.Lock()
+
+def load_gguf_model():
+    """Loads GGUF_MODEL_PATH with llama.cpp, with a RAM prompt cache for shared prefixes."""
+    from llama_cpp import Llama, LlamaRAMCache
+
+    if settings.GGUF_MODEL_PATH is None:
+        raise RuntimeError("GGUF_MODEL_PATH must be set to use the gguf backend")
+    llama = Llama(
+        model_path=str(settings.GGUF_MODEL_PATH),
+        n_ctx=settings.GGUF_N_CTX,
+        n_threads=settings.GGUF_N_THREADS,
+        n_batch=settings.GGUF_N_BATCH,
+        verbose=False,
+    )
+    if settings.GGUF_PROMPT_CACHE_MB:
+        llama.set_cache(LlamaRAMCache(capacity_bytes=settings.GGUF_PROMPT_CACHE_MB * 2**20))
+    return llama
+
+class LlamaCppBackend:
+    """In-process llama.cpp inference on a GGUF model."""
+    kind = "gguf"
+
+    def __init__(self, llama, role: str):
+        self.llama = llama
+        self.role = role
+
+    def generate(self, prompt: str, params: GenerationParams, control: GenerationControl | None = None) -> Iterator[str]:
+        control = control or GenerationControl()
+        with _GGUF_LOCK, _active(self.role, control):
+            timer = GenerationTimer(self.role)
+            timer.put(None)
+            chunks = None
+            try:
+                chunks = self.llama.create_completion(
+                    prompt,
+                    max_tokens=params.max_new_tokens,
+                    temperature=params.temperature if params.do_sample else 0.0,
+                    top_p=params.top_p,
+                    repeat_penalty=params.repetition_penalty,
+                    stop=list(params.stop),
+                    stream=True,
+                )
+                for chunk in chunks:
+                    timer.put(None)
+                    yield chunk["choices"][0]["text"]
+                    if control.should_stop():
+                        break
+            finally:
+                if chunks is not None:
+                    chunks.close()
+                timer.end()
+
+def create_ollama_client():
+    """Creates the blocking Ollama client used by the ollama backend."""
+    import ollama
+
+    return ollama.Client(host=settings.OLLAMA_HOST, timeout=settings.OLLAMA_LLM_TIMEOUT)
+
+class OllamaBackend:
+    """Generation on the Ollama server; the chat template is already applied, so raw mode."""
+    kind = "ollama"
+
+    def __init__(self, client, role: str):
+        self.client = client
+        self.role = role
+
+    def generate(self, prompt: str, params: GenerationParams, control: GenerationControl | None = None) -> Iterator[str]:
+        control = control or GenerationControl()
+        options = {
+            "num_predict": params.max_new_tokens,
+            "temperature": params.temperature if params.do_sample else 0.0,
+            "top_p": params.top_p,
+            "repeat_penalty": params.repetition_penalty,
+            "stop": list(params.stop),
+        }
+        with _active(self.role, control):
+            timer = GenerationTimer(self.role)
+            timer.put(None)
+            chunks = None
+            try:
+                chunks = self.client.generate(
+                    model=settings.OLLAMA_LLM_MODEL, prompt=prompt, raw=True, stream=True, options=options
+                )
+                for chunk in chunks:
+                    if chunk["response"]:
+                        timer.put(None)
+                        yield chunk["response"]
+                    if control.should_stop():
+                        break
+            finally:
+                # Closing the stream drops the HTTP response, which makes Ollama abort the request.
+                if chunks is not None:
+                    chunks.close()
+                timer.end()
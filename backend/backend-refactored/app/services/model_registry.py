@@ -0,0 +1,106 @@
+import asyncio
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+from app.core.config import settings
+
+class ModelNotReady(Exception):
+    """Raised when a model is requested before it has finished loading."""
+    def __init__(self, name: str, state: str, retry_after: int):
+        super().__init__(f"Model '{name}' is not ready ({state})")
+        self.name = name
+        self.state = state
+        self.retry_after = retry_after
+
+@dataclass
+class ModelEntry:
+    name: str
+    loader: Callable[[], Any]
+    lazy: bool = False
+    expected_load_seconds: float = 30.0
+    state: str = "pending"  # pending | loading | ready | failed
+    value: Any = None
+    error: str | None = None
+    started_at: float | None = None
+    finished_at: float | None = None
+    future: Any = None  # concurrent.futures.Future of the load
+
+class ModelRegistry:
+    """Loads models concurrently in background threads and tracks their readiness."""
+    def __init__(self):
+        self._entries: dict[str, ModelEntry] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any], lazy: bool = False, expected_load_seconds: float = 30.0):
+        self._entries[name] = ModelEntry(name, loader, lazy, expected_load_seconds)
+
+    def start(self):
+        """Schedules every eager model; lazy ones wait for their first request.
+
+        Must run on the event loop; later (re)loads are scheduled onto it from any thread,
+        since sync dependencies call get() from FastAPI's threadpool.
+        """
+        self._loop = asyncio.get_running_loop()
+        for entry in self._entries.values():
+            if not entry.lazy:
+                self._schedule(entry)
+
+    def _schedule(self, entry: ModelEntry):
+        entry.state = "loading"
+        entry.error = None
+        entry.started_at = time.monotonic()
+        entry.future = asyncio.run_coroutine_threadsafe(self._load(entry), self._loop)
+
+    async def _load(self, entry: ModelEntry):
+        print(f"Loading model '{entry.name}'...")
+        try:
+            entry.value = await asyncio.to_thread(entry.loader)
+        except Exception as e:
+            entry.state = "failed"
+            entry.error = str(e)
+            print(f"Failed to load model '{entry.name}': {e}")
+        else:
+            entry.state = "ready"
+            print(f"Model '{entry.name}' loaded in {time.monotonic() - entry.started_at:.1f}s.")
+        finally:
+            entry.finished_at = time.monotonic()
+
+    def _retry_after(self, entry: ModelEntry) -> int:
+        if entry.state == "loading":
+            remaining = entry.expected_load_seconds - (time.monotonic() - entry.started_at)
+            return max(1, math.ceil(remaining))
+        return settings.MODEL_RETRY_SECONDS
+
+    def get(self, name: str) -> Any:
+        """Returns a loaded model or raises ModelNotReady, kicking off lazy loads and retries."""
+        entry = self._entries[name]
+        if entry.state == "ready":
+            return entry.value
+
+        with self._lock:
+            if entry.state == "pending":
+                self._schedule(entry)
+            elif entry.state == "failed" and time.monotonic() - entry.finished_at >= settings.MODEL_RETRY_SECONDS:
+                self._schedule(entry)
+        raise ModelNotReady(name, entry.state, self._retry_after(entry))
+
+    def is_ready(self, name: str) -> bool:
+        return self._entries[name].state == "ready"
+
+    def all_ready(self) -> bool:
+        return all(entry.state == "ready" for entry in self._entries.values())
+
+    def status(self) -> dict:
+        """Per-model readiness for the health endpoint."""
+        report = {}
+        for entry in self._entries.values():
+            info = {"state": entry.state, "lazy": entry.lazy}
+            if entry.started_at is not None and entry.finished_at is not None and entry.finished_at >= entry.started_at:
+                info["load_seconds"] = round(entry.finished_at - entry.started_at, 2)
+            if entry.error:
+                info["error"] = entry.error
+            report[entry.name] = info
+        return report
@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+class ProfilerBusy(Exception):
+    """Raised when a profiling session is already running."""
+
+class SamplingProfiler:
+    """Samples the Python stack of every thread from a timer thread.
+
+    Nothing runs until start() is called, so leaving it wired into a production
+    process costs nothing while idle. Output uses the collapsed-stack format
+    understood by flamegraph.pl, speedscope and inferno.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: float | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01, max_seconds: float = 60.0):
+        """Begins sampling every `interval` seconds; stops by itself after `max_seconds`."""
+        with self._lock:
+            if self.running:
+                raise ProfilerBusy("A profiling session is already running")
+            self._stacks = Counter()
+            self.samples = 0
+            self._stop.clear()
+            self.started_at = time.monotonic()
+            self._thread = threading.Thread(
+                target=self._sample_loop, args=(interval, self.started_at + max_seconds), daemon=True, name="sampling-profiler"
+            )
+            self._thread.start()
+
+    def stop(self) -> str:
+        """Stops sampling and returns the collapsed stacks collected so far."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self._stacks.most_common()) + "\n"
+
+    def _sample_loop(self, interval: float, deadline: float):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(interval) and time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+profiler = SamplingProfiler()
+
+def profile_generation(tokenizer, model, device, prompt: str, max_new_tokens: int, trace_path: str):
+    """Runs one generate() call under torch.profiler and writes a Chrome trace to `trace_path`."""
+    import torch
+    from torch.profiler import ProfilerActivity, profile
+
+    activities = [ProfilerActivity.CPU]
+    if device == "cuda":
+        activities.append(ProfilerActivity.CUDA)
+
+    inputs = tokenizer(prompt, return_tensors="pt").to(device)
+    with profile(activities=activities, record_shapes=True) as prof, torch.no_grad():
+        model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False, eos_token_id=tokenizer.eos_token_id)
+    prof.export_chrome_trace(trace_path)
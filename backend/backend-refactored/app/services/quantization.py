@@ -0,0 +1,70 @@
+from app.core.config import settings
+
+# Short chat prompts whose next-token predictions are compared before and after
+# quantization; they exercise the same chat template as production prompts.
+CALIBRATION_PROMPTS = [
+    "<|start_header_id|>user<|end_header_id|>\nQuery: What is photosynthesis?\nEmotion: happy<|eot_id|>\n<|start_header_id|>assistant<|end_header_id|>\n",
+    "<|start_header_id|>user<|end_header_id|>\nQuery: Explain Newton's second law.\nEmotion: neutral<|eot_id|>\n<|start_header_id|>assistant<|end_header_id|>\n",
+    "<|start_header_id|>user<|end_header_id|>\nTitle: Deep learning for protein folding\nSnippet: We present a model that predicts structures.<|eot_id|>\n<|start_header_id|>assistant<|end_header_id|>\nThis article states that ",
+]
+
+QUANTIZATION_MODES = ("none", "int8-dynamic", "int8-weight", "int4-weight")
+
+class QuantizationRejected(Exception):
+    """Raised when a quantized model drifts too far from the fp32 reference."""
+
+def _calibration_logits(tokenizer, model) -> list:
+    import torch
+
+    logits = []
+    with torch.no_grad():
+        for prompt in CALIBRATION_PROMPTS:
+            inputs = tokenizer(prompt, return_tensors="pt")
+            logits.append(model(**inputs).logits[0].float())
+    return logits
+
+def _apply(model, mode: str):
+    import torch
+
+    if mode == "int8-dynamic":
+        # int8 weights, activations quantized on the fly per batch; Linear layers only.
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    from optimum.quanto import freeze, qint4, qint8, quantize
+
+    quantize(model, weights=qint8 if mode == "int8-weight" else qint4)
+    freeze(model)
+    return model
+
+def quantize_for_cpu(tokenizer, model, mode: str):
+    """Quantizes `model` in place and validates it against its own fp32 predictions.
+
+    Returns the quantized model and a small report; raises QuantizationRejected
+    when next-token agreement with the fp32 model falls below
+    LLM_QUANTIZATION_MIN_AGREEMENT.
+    """
+    import torch
+
+    if mode not in QUANTIZATION_MODES[1:]:
+        raise ValueError(f"Unknown quantization mode '{mode}', expected one of {QUANTIZATION_MODES}")
+
+    reference = _calibration_logits(tokenizer, model)
+    model = _apply(model, mode)
+    candidate = _calibration_logits(tokenizer, model)
+
+    matches = total = 0
+    similarities = []
+    for ref, cand in zip(reference, candidate):
+        matches += int((ref.argmax(-1) == cand.argmax(-1)).sum())
+        total += ref.shape[0]
+        similarities.append(float(torch.nn.functional.cosine_similarity(ref, cand, dim=-1).mean()))
+
+    report = {
+        "mode": mode,
+        "top1_agreement": round(matches / total, 4),
+        "logit_cosine": round(sum(similarities) / len(similarities), 4),
+    }
+    print(f"Quantization check: {report}")
+    if report["top1_agreement"] < settings.LLM_QUANTIZATION_MIN_AGREEMENT:
+        raise QuantizationRejected(f"{mode} top-1 agreement {report['top1_agreement']} is below the configured minimum")
+    return model, report
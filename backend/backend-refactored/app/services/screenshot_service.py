@@ -0,0 +1,184 @@
+import io
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+from app.core.config import settings
+
+class BrowserUnavailable(Exception):
+    """Raised when no pooled browser frees up within SCREENSHOT_ACQUIRE_TIMEOUT."""
+
+@dataclass
+class _Browser:
+    driver: Any
+    uses: int = 0
+    base_handle: str = ""
+
+@dataclass
+class BrowserPool:
+    """Warm headless Chrome instances, each recycled after `max_uses` captures."""
+    size: int
+    max_uses: int
+    _idle: queue.Queue = field(default_factory=queue.Queue)
+    _created: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _closed: bool = False
+
+    def _launch(self) -> _Browser:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-first-run")
+        options.add_argument("--disable-extensions")
+        options.add_argument(f"--window-size={settings.SCREENSHOT_VIEWPORT[0]},{settings.SCREENSHOT_VIEWPORT[1]}")
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(settings.SCREENSHOT_TIMEOUT)
+        return _Browser(driver, base_handle=driver.current_window_handle)
+
+    def warm(self):
+        """Starts browsers until the pool is full; meant to run off the event loop at startup."""
+        while True:
+            with self._lock:
+                if self._closed or self._created >= self.size:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._launch())
+            except Exception as e:
+                with self._lock:
+                    self._created -= 1
+                print(f"Could not start a headless browser: {e}")
+                return
+
+    def acquire(self) -> _Browser:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_launch = self._created < self.size
+            if can_launch:
+                self._created += 1
+        if can_launch:
+            try:
+                return self._launch()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=settings.SCREENSHOT_ACQUIRE_TIMEOUT)
+        except queue.Empty:
+            raise BrowserUnavailable(f"All {self.size} browsers are busy")
+
+    def release(self, browser: _Browser, healthy: bool = True):
+        browser.uses += 1
+        if healthy and browser.uses < self.max_uses and not self._closed:
+            self._idle.put(browser)
+            return
+        self._discard(browser)
+
+    def _discard(self, browser: _Browser):
+        with self._lock:
+            self._created -= 1
+        try:
+            browser.driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+def _capture_with(browser: _Browser, url: str, width: int, height: int) -> bytes:
+    """Loads `url` in a throwaway browser context (no shared cookies or storage) and returns a PNG."""
+    from selenium.common.exceptions import TimeoutException
+
+    driver = browser.driver
+    context_id = driver.execute_cdp_cmd("Target.createBrowserContext", {"disposeOnDetach": True})["browserContextId"]
+    try:
+        target_id = driver.execute_cdp_cmd(
+            "Target.createTarget", {"url": "about:blank", "browserContextId": context_id}
+        )["targetId"]
+        # chromedriver window handles are CDP target ids.
+        driver.switch_to.window(target_id)
+        try:
+            driver.execute_cdp_cmd(
+                "Emulation.setDeviceMetricsOverride",
+                {"width": width, "height": height, "deviceScaleFactor": 1, "mobile": False},
+            )
+            try:
+                driver.get(url)
+            except TimeoutException:
+                # Slow page: keep whatever has rendered by the deadline.
+                driver.execute_script("window.stop();")
+            return driver.get_screenshot_as_png()
+        finally:
+            driver.close()
+            driver.switch_to.window(browser.base_handle)
+    finally:
+        driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": context_id})
+
+# Screenshots (PNG) and thumbnails (JPEG) keyed by (url, width, height, thumb width); TTL + LRU.
+_cache: "OrderedDict[tuple, tuple[float, bytes]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cache_get(key: tuple) -> bytes | None:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > settings.SCREENSHOT_CACHE_TTL_SECONDS:
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return entry[1]
+
+def _cache_put(key: tuple, data: bytes):
+    with _cache_lock:
+        _cache[key] = (time.monotonic(), data)
+        while len(_cache) > settings.SCREENSHOT_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+def _thumbnail(png_bytes: bytes, width: int) -> bytes:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png_bytes)) as img:
+        img = img.convert("RGB")
+        img.thumbnail((width, width * img.height // max(1, img.width)), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=settings.IMAGE_JPEG_QUALITY)
+        return buffer.getvalue()
+
+def capture(pool: BrowserPool, url: str, width: int, height: int, thumb_width: int | None = None) -> bytes:
+    """Returns a PNG screenshot of `url` (or a JPEG thumbnail), served from cache when fresh."""
+    key = (url, width, height, thumb_width)
+    if (cached := _cache_get(key)) is not None:
+        return cached
+
+    full_key = (url, width, height, None)
+    png = _cache_get(full_key)
+    if png is None:
+        browser = pool.acquire()
+        healthy = False
+        try:
+            png = _capture_with(browser, url, width, height)
+            healthy = True
+        finally:
+            pool.release(browser, healthy)
+        _cache_put(full_key, png)
+
+    if thumb_width is None:
+        return png
+    thumbnail = _thumbnail(png, thumb_width)
+    _cache_put(key, thumbnail)
+    return thumbnail
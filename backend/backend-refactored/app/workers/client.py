@@ -0,0 +1,176 @@
+import asyncio
+from pathlib import Path
+from app.core import tracing
+from app.workers.protocol import read_message, send_message
+
+class WorkerUnavailable(Exception):
+    """Raised when no replica of a role accepts the request."""
+    def __init__(self, role: str, reason: str):
+        super().__init__(f"Worker '{role}' unavailable: {reason}")
+        self.role = role
+
+class WorkerError(Exception):
+    """An operation raised inside the worker process."""
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def alive(self) -> bool:
+        """False once the worker has hung up (e.g. it crashed while the connection sat idle)."""
+        return not self.reader.at_eof() and not self.writer.is_closing()
+
+    def close(self):
+        self.writer.close()
+
+class WorkerPool:
+    """Forwards calls to the least-busy replica of one role, reusing idle connections."""
+    def __init__(self, role: str, socket_paths: list[Path], max_idle_per_replica: int = 4):
+        self.role = role
+        self.socket_paths = socket_paths
+        self.max_idle_per_replica = max_idle_per_replica
+        self.in_flight = [0] * len(socket_paths)
+        self._idle: list[list[_Connection]] = [[] for _ in socket_paths]
+
+    async def _checkout(self, replica: int) -> _Connection:
+        while self._idle[replica]:
+            connection = self._idle[replica].pop()
+            if connection.alive():
+                return connection
+            connection.close()
+        try:
+            reader, writer = await asyncio.open_unix_connection(str(self.socket_paths[replica]))
+        except (FileNotFoundError, ConnectionError) as e:
+            raise WorkerUnavailable(self.role, str(e))
+        return _Connection(reader, writer)
+
+    def _checkin(self, replica: int, connection: _Connection):
+        if len(self._idle[replica]) < self.max_idle_per_replica:
+            self._idle[replica].append(connection)
+        else:
+            connection.close()
+
+    def _replica_order(self, avoid: int | None = None) -> list[int]:
+        # Least busy first; a replica whose connection just dropped goes last.
+        return sorted(range(len(self.socket_paths)), key=lambda i: (i == avoid, self.in_flight[i]))
+
+    async def _connect(self, avoid: int | None = None) -> tuple[int, _Connection]:
+        """Connects to the least-loaded replica, falling back to the others."""
+        last_error = None
+        for replica in self._replica_order(avoid):
+            try:
+                return replica, await self._checkout(replica)
+            except WorkerUnavailable as e:
+                last_error = e
+        raise last_error or WorkerUnavailable(self.role, "no replicas configured")
+
+    async def call(self, op: str, *args):
+        """Runs `op` on a replica and returns its result.
+
+        Only a request that never fully reached a worker is retried (once, preferring
+        another replica): a worker dying mid-request may have died on this very input.
+        """
+        message = {"op": op, "args": args, "trace": tracing.current_context()}
+        failed_replica = None
+        for attempt in range(2):
+            replica, connection = await self._connect(avoid=failed_replica)
+            self.in_flight[replica] += 1
+            sent = False
+            try:
+                await send_message(connection.writer, message)
+                sent = True
+                reply = await read_message(connection.reader)
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                connection.close()
+                if sent or attempt:
+                    raise WorkerUnavailable(self.role, f"connection lost ({e})")
+                failed_replica = replica
+                continue
+            except BaseException:
+                connection.close()
+                raise
+            finally:
+                self.in_flight[replica] -= 1
+
+            self._checkin(replica, connection)
+            if "error" in reply:
+                raise WorkerError(reply["error"])
+            return reply["result"]
+
+    async def stream(self, op: str, *args):
+        """Runs a streaming `op` on a replica and yields its chunks.
+
+        Retried like call(): only when the request never fully reached a worker.
+        """
+        message = {"op": op, "args": args, "trace": tracing.current_context()}
+        failed_replica = None
+        for attempt in range(2):
+            replica, connection = await self._connect(avoid=failed_replica)
+            self.in_flight[replica] += 1
+            completed = sent = False
+            try:
+                await send_message(connection.writer, message)
+                sent = True
+                while True:
+                    reply = await read_message(connection.reader)
+                    if "chunk" in reply:
+                        yield reply["chunk"]
+                        continue
+                    completed = True
+                    if "error" in reply:
+                        raise WorkerError(reply["error"])
+                    return
+            except (asyncio.IncompleteReadError, ConnectionError) as e:
+                if sent or attempt:
+                    raise WorkerUnavailable(self.role, f"connection lost ({e})")
+                failed_replica = replica
+            finally:
+                self.in_flight[replica] -= 1
+                # A stream abandoned halfway leaves unread frames behind; drop it.
+                if completed:
+                    self._checkin(replica, connection)
+                else:
+                    connection.close()
+
+    async def call_each(self, op: str, *args) -> dict[int, object]:
+        """Runs `op` once on every reachable replica; unreachable ones are left out."""
+        results = {}
+        for replica in range(len(self.socket_paths)):
+            try:
+                connection = await self._checkout(replica)
+            except WorkerUnavailable:
+                continue
+            try:
+                await send_message(connection.writer, {"op": op, "args": args, "trace": tracing.current_context()})
+                reply = await read_message(connection.reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                connection.close()
+                continue
+            self._checkin(replica, connection)
+            if "result" in reply:
+                results[replica] = reply["result"]
+        return results
+
+    async def _probe(self, replica: int) -> bool:
+        """Whether the replica accepts connections; a stale socket file from a crashed worker does not."""
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_unix_connection(str(self.socket_paths[replica])), 1.0)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    async def status(self) -> dict:
+        ready = await asyncio.gather(*(self._probe(replica) for replica in range(len(self.socket_paths))))
+        return {
+            "replicas": len(self.socket_paths),
+            "ready": sum(ready),
+            "in_flight": sum(self.in_flight),
+        }
+
+    def close(self):
+        for connections in self._idle:
+            for connection in connections:
+                connection.close()
+            connections.clear()
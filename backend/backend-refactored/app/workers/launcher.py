@@ -0,0 +1,122 @@
+"""Starts the inference workers, and optionally the API gateway, as separate processes.
+
+    python -m app.workers.launcher --replicas llm=1 stt=1 tts=2 emotion=2 vision=1 --gateway
+
+Each replica is its own process listening on WORKER_SOCKET_DIR/<role>-<n>.sock,
+so one subsystem running out of memory only takes down (and restarts) itself.
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from app.core.config import settings
+from app.workers.roles import ROLES, ensure_private_dir, socket_dir, socket_path
+
+RESTART_BACKOFF_SECONDS = 2.0
+
+def parse_replicas(values: list[str]) -> dict[str, int]:
+    replicas = dict(settings.WORKER_REPLICAS)
+    for value in values:
+        role, _, count = value.partition("=")
+        if role not in ROLES or not count.isdigit():
+            raise SystemExit(f"Invalid replica spec '{value}', expected <{'|'.join(ROLES)}>=<count>")
+        replicas[role] = int(count)
+    return replicas
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the role-split deployment.")
+    parser.add_argument("--replicas", nargs="*", default=[], help="role=count pairs, e.g. llm=1 emotion=2")
+    parser.add_argument("--threads-per-worker", type=int, help="torch/BLAS threads for each worker process")
+    parser.add_argument("--gateway", action="store_true", help="also run the API gateway")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--gateway-workers", type=int, default=1)
+    args = parser.parse_args()
+
+    replicas = parse_replicas(args.replicas)
+    created_dir = None
+    try:
+        directory = socket_dir()
+    except RuntimeError:
+        # mkdtemp makes a fresh 0700 directory nobody else can have pre-created.
+        directory = created_dir = Path(tempfile.mkdtemp(prefix="robolearn-workers-"))
+    ensure_private_dir(directory)
+    settings.WORKER_SOCKET_DIR = directory
+
+    env = {
+        **os.environ,
+        "DEPLOYMENT_MODE": "gateway",
+        "WORKER_REPLICAS": json.dumps(replicas),
+        "WORKER_SOCKET_DIR": str(directory),
+    }
+    worker_env = dict(env)
+    if args.threads_per_worker:
+        for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+            worker_env[var] = str(args.threads_per_worker)
+
+    commands: dict[str, tuple[list[str], dict]] = {}
+    for role, count in replicas.items():
+        for replica in range(count):
+            commands[f"{role}-{replica}"] = (
+                [sys.executable, "-m", "app.workers.server", role, str(socket_path(role, replica))],
+                worker_env,
+            )
+    if args.gateway:
+        commands["gateway"] = (
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", args.host,
+             "--port", str(args.port), "--workers", str(args.gateway_workers)],
+            env,
+        )
+
+    processes: dict[str, subprocess.Popen] = {}
+    last_start: dict[str, float] = {}
+
+    def start(name: str):
+        command, process_env = commands[name]
+        print(f"Starting {name}: {' '.join(command)}")
+        processes[name] = subprocess.Popen(command, env=process_env)
+        last_start[name] = time.monotonic()
+
+    stopping = False
+
+    def stop(*_):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for name in commands:
+        start(name)
+
+    try:
+        while not stopping:
+            time.sleep(0.5)
+            for name, process in list(processes.items()):
+                code = process.poll()
+                if code is None:
+                    continue
+                # Supervise: restart crashed replicas (e.g. OOM-killed) with a small backoff.
+                if time.monotonic() - last_start[name] >= RESTART_BACKOFF_SECONDS:
+                    print(f"{name} exited with code {code}, restarting")
+                    start(name)
+    finally:
+        for process in processes.values():
+            if process.poll() is None:
+                process.terminate()
+        for process in processes.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if created_dir is not None:
+            shutil.rmtree(created_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
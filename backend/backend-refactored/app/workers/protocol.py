@@ -0,0 +1,18 @@
+import asyncio
+import pickle
+import struct
+
+# Frames are a 4-byte big-endian length followed by a pickled dict. The
+# transport is a Unix socket owned by the service user (mode 0600), so only
+# our own gateway and workers ever exchange frames.
+_HEADER = struct.Struct(">I")
+
+async def send_message(writer: asyncio.StreamWriter, message: dict):
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    writer.write(_HEADER.pack(len(payload)) + payload)
+    await writer.drain()
+
+async def read_message(reader: asyncio.StreamReader) -> dict:
+    header = await reader.readexactly(_HEADER.size)
+    (length,) = _HEADER.unpack(header)
+    return pickle.loads(await reader.readexactly(length))
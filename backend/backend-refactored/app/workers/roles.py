@@ -0,0 +1,102 @@
+import os
+import stat
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+from app.core.config import settings
+from app.services import ai_service, audio_service, emotion_service, llm_backends
+
+@dataclass
+class Role:
+    """An inference subsystem: how to load its model and which operations it serves."""
+    loader: Callable[[], Any] | None
+    ops: dict[str, Callable] = field(default_factory=dict)
+
+# LLM ops take a keyword-only `cancel` control: the server cancels it when the
+# gateway hangs up (client left, bundle part timed out), stopping the generation.
+def _research(backends, question: str, emotion: str, level: int | None = None, *, cancel=None) -> str:
+    control = llm_backends.GenerationControl.for_role("research", parent=cancel)
+    return ai_service.generate_research_response(backends["research"], question, emotion, level, control)
+
+def _lesson(backends, query: str, level: int, *, cancel=None) -> str:
+    control = llm_backends.GenerationControl.for_role("research", parent=cancel)
+    return ai_service.generate_lesson(backends["research"], query, level, control)
+
+async def _stream_lesson(backends, query: str, level: int, *, cancel=None):
+    control = llm_backends.GenerationControl.for_role("research", parent=cancel)
+    async for delta in llm_backends.iterate_in_thread(ai_service.stream_lesson(backends["research"], query, level, control), control):
+        yield delta
+
+def _summarize(backends, content: str, *, cancel=None) -> str:
+    control = llm_backends.GenerationControl.for_role("summarize", parent=cancel)
+    return ai_service.generate_summary(backends["summarize"], content, control)
+
+async def _stream_summary(backends, content: str, *, cancel=None):
+    control = llm_backends.GenerationControl.for_role("summarize", parent=cancel)
+    async for delta in llm_backends.iterate_in_thread(ai_service.stream_summary(backends["summarize"], content, control), control):
+        yield delta
+
+async def _summarize_batch(backends, contents: list[str], *, cancel=None):
+    control = ai_service.summary_batch_control(len(contents), parent=cancel)
+    results = ai_service.generate_summaries(backends["summarize"], contents, control)
+    async for item in llm_backends.iterate_in_thread(results, control):
+        yield item
+
+def _transcribe(model, contents: bytes) -> str:
+    return audio_service.transcribe_audio_bytes(model, contents)
+
+def _synthesize(_, text: str) -> bytes:
+    return audio_service.generate_tts_audio(text)
+
+def _detect_emotion(detector, image_bytes: bytes) -> dict:
+    return emotion_service.detect_emotion_from_bytes(detector, image_bytes)
+
+# Vision ops receive images already prepared (and validated) by the gateway.
+async def _analyze_image(client, image_bytes: bytes, filename: str) -> str:
+    return await ai_service.analyze_image_with_ollama(client, image_bytes, filename)
+
+async def _stream_image(client, image_bytes: bytes, filename: str):
+    async for chunk in ai_service.stream_image_analysis(client, image_bytes, filename):
+        yield chunk
+
+ROLES: dict[str, Role] = {
+    "llm": Role(ai_service.load_llm_backends, {
+        "research": _research,
+        "lesson": _lesson,
+        "stream_lesson": _stream_lesson,
+        "summarize": _summarize,
+        "summarize_batch": _summarize_batch,
+        "stream_summary": _stream_summary,
+    }),
+    "stt": Role(audio_service.load_whisper_model, {"transcribe": _transcribe}),
+    "tts": Role(None, {"synthesize": _synthesize}),
+    "emotion": Role(emotion_service.load_detector, {"detect": _detect_emotion}),
+    "vision": Role(ai_service.create_vision_client, {"analyze": _analyze_image, "stream": _stream_image}),
+}
+
+def socket_dir() -> Path:
+    if settings.WORKER_SOCKET_DIR is not None:
+        return settings.WORKER_SOCKET_DIR
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        raise RuntimeError("WORKER_SOCKET_DIR is not set and there is no XDG_RUNTIME_DIR; start via app.workers.launcher or set it")
+    return Path(runtime_dir) / "robolearn-workers"
+
+def ensure_private_dir(path: Path):
+    """Creates `path` with mode 0700, or checks an existing one belongs to us with mode 0700.
+
+    Anyone who can write to the socket directory can feed pickle frames to the
+    workers or the gateway, so a directory someone else created is refused.
+    """
+    try:
+        path.mkdir(mode=0o700, parents=True)
+    except FileExistsError:
+        pass
+    info = path.lstat()
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or stat.S_IMODE(info.st_mode) != 0o700:
+        raise RuntimeError(
+            f"Refusing to use worker socket dir {path}: it must be a directory owned by uid {os.getuid()} with mode 0700"
+        )
+
+def socket_path(role: str, replica: int) -> Path:
+    return socket_dir() / f"{role}-{replica}.sock"
@@ -0,0 +1,100 @@
+"""Runs one inference worker replica on a Unix socket.
+
+    python -m app.workers.server <role> <socket-path>
+"""
+import asyncio
+import inspect
+import os
+import sys
+from pathlib import Path
+from app.core import metrics, tracing
+from app.services.llm_backends import GenerationControl
+from app.workers.protocol import read_message, send_message
+from app.workers.roles import ROLES, Role, ensure_private_dir
+
+def _collect_metrics(_):
+    return metrics.collect()
+
+# Operations every role answers in addition to its own.
+BUILTIN_OPS = {"__metrics__": _collect_metrics}
+
+async def _cancel_on_hangup(reader: asyncio.StreamReader, cancel: GenerationControl):
+    """The gateway never writes while a request is in flight, so EOF here means it gave up."""
+    try:
+        await reader.read(1)
+    except ConnectionError:
+        pass
+    cancel.cancel("disconnected")
+
+async def _dispatch(role: Role, model, message: dict, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    handler = role.ops.get(message["op"]) or BUILTIN_OPS.get(message["op"])
+    if handler is None:
+        await send_message(writer, {"error": f"Unknown op '{message['op']}'"})
+        return
+
+    args = message.get("args", ())
+    kwargs = {}
+    watcher = None
+    if "cancel" in inspect.signature(handler).parameters:
+        kwargs["cancel"] = GenerationControl()
+        watcher = asyncio.create_task(_cancel_on_hangup(reader, kwargs["cancel"]))
+    try:
+        if inspect.isasyncgenfunction(handler):
+            async for chunk in handler(model, *args, **kwargs):
+                await send_message(writer, {"chunk": chunk})
+            reply = {"end": True}
+        elif inspect.iscoroutinefunction(handler):
+            reply = {"result": await handler(model, *args, **kwargs)}
+        else:
+            reply = {"result": await asyncio.to_thread(handler, model, *args, **kwargs)}
+    except (ConnectionError, asyncio.IncompleteReadError):
+        raise
+    except Exception as e:
+        print(f"Worker op '{message['op']}' failed: {e}")
+        reply = {"error": str(e)}
+    finally:
+        # Stop watching before the final reply: the gateway may send its next request right after.
+        if watcher is not None:
+            watcher.cancel()
+            await asyncio.gather(watcher, return_exceptions=True)
+    await send_message(writer, reply)
+
+async def serve(role_name: str, path: Path):
+    role = ROLES[role_name]
+    model = None
+    if role.loader is not None:
+        print(f"[{role_name}] Loading model...")
+        model = await asyncio.to_thread(role.loader)
+
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Each connection carries one request at a time; the gateway pools them.
+        try:
+            while True:
+                message = await read_message(reader)
+                with tracing.use_context(message.get("trace")):
+                    with tracing.span(f"worker {role_name}.{message['op']}"):
+                        await _dispatch(role, model, message, reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    ensure_private_dir(path.parent)
+    if path.exists():
+        path.unlink()
+    # The socket only appears once the model is loaded, so "connection refused"
+    # is how the gateway tells that a replica is still starting. It is created
+    # 0600 from the start rather than chmod-ed after bind.
+    previous_umask = os.umask(0o177)
+    try:
+        server = await asyncio.start_unix_server(handle_connection, path=str(path))
+    finally:
+        os.umask(previous_umask)
+    print(f"[{role_name}] Serving on {path}")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ROLES:
+        sys.exit(f"usage: python -m app.workers.server <{'|'.join(ROLES)}> <socket-path>")
+    asyncio.run(serve(sys.argv[1], Path(sys.argv[2])))
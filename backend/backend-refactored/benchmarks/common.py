@@ -0,0 +1,51 @@
+import json
+import math
+import subprocess
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+FIXTURE_IMAGES = [
+    PROJECT_DIR.parent / "emotion-detection" / "happy.jpg",
+    PROJECT_DIR.parent / "emotion-detection" / "me.jpg",
+]
+
+def git_commit() -> str:
+    """Short hash of HEAD, suffixed with -dirty when the tree has local changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain"], cwd=PROJECT_DIR, capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+def write_results(kind: str, payload: dict, output: Path | None = None) -> Path:
+    """Stores a benchmark run as results/<commit>-<kind>.json (or `output`)."""
+    commit = git_commit()
+    document = {"kind": kind, "commit": commit, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), **payload}
+    path = output or RESULTS_DIR / f"{commit}-{kind}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2))
+    return path
+
+def compare(baseline_path: Path, candidate_path: Path, metrics: tuple[str, ...]):
+    """Prints per-entry deltas for the given numeric fields of two result files."""
+    baseline = json.loads(baseline_path.read_text())["results"]
+    candidate = json.loads(candidate_path.read_text())["results"]
+    print(f"{'entry':<32} {'metric':<16} {'baseline':>12} {'candidate':>12} {'delta':>9}")
+    for name in sorted(set(baseline) & set(candidate)):
+        for metric in metrics:
+            old, new = baseline[name].get(metric), candidate[name].get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+                continue
+            delta = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            print(f"{name:<32} {metric:<16} {old:>12.3f} {new:>12.3f} {delta:>9}")
@@ -0,0 +1,49 @@
+"""Ollama-compatible stand-in serving POST /api/chat with canned, paced tokens.
+
+    python -m benchmarks.fake_ollama --port 11435 --token-delay 0.02
+"""
+import argparse
+import asyncio
+import json
+from datetime import datetime, timezone
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANSWER = "The image shows a worksheet question . The answer is 42 because six times seven is forty-two ."
+
+def create_app(token_delay: float = 0.02) -> FastAPI:
+    app = FastAPI(title="Fake Ollama")
+
+    def chunk(content: str, done: bool) -> dict:
+        return {
+            "model": "fake",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+        }
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        tokens = [word + " " for word in ANSWER.split()]
+        if body.get("stream", True):
+            async def lines():
+                for token in tokens:
+                    await asyncio.sleep(token_delay)
+                    yield json.dumps(chunk(token, False)) + "\n"
+                yield json.dumps(chunk("", True)) + "\n"
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        await asyncio.sleep(token_delay * len(tokens))
+        return JSONResponse(chunk("".join(tokens), True))
+
+    return app
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.token_delay), host="127.0.0.1", port=args.port)
@@ -0,0 +1,86 @@
+"""Import-time benchmark for the API process and its lightweight entry points.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter and
+reports the wall time plus the slowest top-level packages. Heavy ML libraries
+showing up in a module that should not need them are flagged.
+
+Usage (from backend/backend-refactored):
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime app.api.routers.utility --top 15
+    python -m benchmarks.importtime --json results/importtime.json --fail-on-heavy
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_MODULES = ["app.main"]
+
+HEAVY_PACKAGES = {"torch", "transformers", "whisper", "fer", "tensorflow", "cv2", "ollama", "selenium", "keras"}
+
+def measure(module: str) -> dict:
+    """Imports `module` in a fresh interpreter and parses the -X importtime trace."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+    )
+    wall_seconds = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    # Lines look like: "import time:       412 |       1874 |   encodings"
+    packages: dict[str, int] = {}
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        total_us += int(self_us)
+        # Only count top-level imports (no leading indentation in the name column).
+        if not line.split("|")[-1].startswith("  "):
+            top = name.split(".")[0]
+            packages[top] = packages.get(top, 0) + int(cumulative_us)
+
+    heavy = sorted(HEAVY_PACKAGES.intersection(packages))
+    return {
+        "module": module,
+        "wall_seconds": round(wall_seconds, 3),
+        "import_seconds": round(total_us / 1e6, 3),
+        "packages": dict(sorted(packages.items(), key=lambda kv: kv[1], reverse=True)),
+        "heavy_packages": heavy,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="slowest packages to print")
+    parser.add_argument("--json", type=Path, help="write the full report to this file")
+    parser.add_argument("--fail-on-heavy", action="store_true", help="exit 1 if a heavy ML package is imported")
+    args = parser.parse_args()
+
+    reports = [measure(module) for module in args.modules]
+    for report in reports:
+        print(f"{report['module']}: {report['import_seconds']:.3f}s import, {report['wall_seconds']:.3f}s wall")
+        for name, cumulative_us in list(report["packages"].items())[:args.top]:
+            print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+        if report["heavy_packages"]:
+            print(f"  heavy packages imported: {', '.join(report['heavy_packages'])}")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(reports, indent=2))
+
+    if args.fail_on_heavy and any(report["heavy_packages"] for report in reports):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""End-to-end load test of the API running on tiny stand-in models.
+
+Boots the real app in-process (random-init Llama, stub FER, Whisper tiny,
+fake Piper, fake Ollama), drives each endpoint with N concurrent clients
+and reports p50/p95/p99 latency, throughput and peak RSS. Results are stored
+as benchmarks/results/<commit>-loadtest.json for comparison across commits.
+
+Usage (from backend/backend-refactored):
+    python -m benchmarks.loadtest --concurrency 4 --requests 40
+    python -m benchmarks.loadtest --endpoints research summarize --concurrency 1 8
+    python -m benchmarks.loadtest compare results/abc123-loadtest.json results/def456-loadtest.json
+"""
+import argparse
+import asyncio
+import base64
+import os
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from benchmarks import common, standins
+
+@dataclass
+class Workload:
+    method: str
+    path: str
+    json: dict | None = None
+    files: dict | None = None
+    data: dict | None = None
+
+def build_workloads(tmp_dir: Path) -> dict[str, Workload]:
+    image_bytes = common.FIXTURE_IMAGES[0].read_bytes()
+    data_url = "data:image/jpeg;base64," + base64.b64encode(image_bytes).decode()
+    workloads = {
+        "health": Workload("GET", "/api/health"),
+        "research": Workload("POST", "/api/research", json={"question": "How do plants make energy from light?", "emotion": "happy"}),
+        "summarize": Workload("POST", "/api/summarize", json={"content": "Title: Photosynthesis\nSnippet: Plants convert light into chemical energy. " * 20}),
+        "emotion": Workload("POST", "/api/emotion", json={"image_data": data_url}),
+        "detect-emotion": Workload("POST", "/api/detect-emotion", files={"file": ("happy.jpg", image_bytes, "image/jpeg")}),
+        "text-to-speech": Workload("POST", "/api/text-to-speech", json={"text": "This article states that plants convert light into energy."}),
+        "analyze-image": Workload("POST", "/api/analyze-image", files={"file": ("happy.jpg", image_bytes, "image/jpeg")}),
+        "upload-image": Workload("POST", "/api/upload-image", files={"file": ("happy.jpg", image_bytes, "image/jpeg")}),
+    }
+    webm = standins.make_webm_fixture(tmp_dir / "tone.webm")
+    if webm is not None:
+        workloads["transcribe"] = Workload("POST", "/api/transcribe", files={"file": ("tone.webm", webm.read_bytes(), "audio/webm")})
+    return workloads
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _serve_in_thread(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    return server
+
+def _rss_bytes() -> int:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        # ru_maxrss is KiB on Linux; good enough as a peak when psutil is absent.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+async def _wait_ready(client, timeout: float = 600.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            health = (await client.get("/api/health")).json()
+            states = {name: info["state"] for name, info in health["models"].items()}
+            if all(state in ("ready", "failed") for state in states.values()):
+                return states
+        except Exception:
+            pass
+        await asyncio.sleep(0.25)
+    raise TimeoutError("models did not finish loading")
+
+async def run_workload(client, workload: Workload, concurrency: int, total_requests: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = total_requests
+    peak_rss = _rss_bytes()
+
+    async def one_client():
+        nonlocal remaining, errors, peak_rss
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(workload.method, workload.path, json=workload.json, files=workload.files, data=workload.data)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+            peak_rss = max(peak_rss, _rss_bytes())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_client() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(common.percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(common.percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(common.percentile(latencies, 99) * 1000, 2),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "peak_rss_mb": round(peak_rss / 2**20, 1),
+    }
+
+async def run(args) -> dict:
+    import httpx
+
+    tmp_dir = Path(tempfile.mkdtemp(prefix="robolearn-bench-"))
+    ollama_port, api_port = _free_port(), _free_port()
+    # Settings are read on first import of app.*, so configure everything first.
+    (tmp_dir / "images").mkdir(parents=True)
+    os.environ["IMAGE_DIR"] = str(tmp_dir / "images")
+    os.environ["TEMP_DIR"] = str(tmp_dir / "uploads")
+    standins.install(tmp_dir, ollama_port)
+
+    from benchmarks.fake_ollama import create_app
+    from app.main import app
+
+    servers = [_serve_in_thread(create_app(args.ollama_token_delay), ollama_port), _serve_in_thread(app, api_port)]
+    workloads = build_workloads(tmp_dir)
+    selected = args.endpoints or list(workloads)
+
+    results = {}
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api_port}", timeout=600) as client:
+        boot_started = time.perf_counter()
+        while True:
+            try:
+                await client.get("/api/health")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.05)
+        first_response_seconds = time.perf_counter() - boot_started
+        model_states = await _wait_ready(client)
+        print(f"App answering after {first_response_seconds:.2f}s; models: {model_states}")
+
+        for name in selected:
+            if name not in workloads:
+                print(f"Skipping unknown or unavailable endpoint '{name}'")
+                continue
+            for concurrency in args.concurrency:
+                # Warm up lazily-initialised paths before measuring.
+                await run_workload(client, workloads[name], 1, args.warmup)
+                result = await run_workload(client, workloads[name], concurrency, args.requests)
+                key = f"{name}@c{concurrency}"
+                results[key] = result
+                print(f"{key:<28} p50 {result['p50_ms']:>9.1f} ms  p95 {result['p95_ms']:>9.1f} ms  "
+                      f"p99 {result['p99_ms']:>9.1f} ms  {result['throughput_rps']:>7.2f} req/s  "
+                      f"{result['errors']} errors  rss {result['peak_rss_mb']} MB")
+
+    for server in servers:
+        server.should_exit = True
+    return {
+        "config": {"concurrency": args.concurrency, "requests": args.requests, "python": sys.version.split()[0]},
+        "boot_seconds": round(first_response_seconds, 3),
+        "results": results,
+    }
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        parser = argparse.ArgumentParser(prog="loadtest compare")
+        parser.add_argument("baseline", type=Path)
+        parser.add_argument("candidate", type=Path)
+        args = parser.parse_args(sys.argv[2:])
+        common.compare(args.baseline, args.candidate, ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "peak_rss_mb"))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", nargs="*", help="subset of workloads to run (default: all)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4])
+    parser.add_argument("--requests", type=int, default=40, help="requests per endpoint and concurrency level")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--ollama-token-delay", type=float, default=0.02)
+    parser.add_argument("--output", type=Path, help="result file (default: results/<commit>-loadtest.json)")
+    args = parser.parse_args()
+
+    payload = asyncio.run(run(args))
+    path = common.write_results("loadtest", payload, args.output)
+    print(f"Results written to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from app.services import ai_service
+
+def bench_generate_summary_tiny_llm(benchmark, summarize_backend):
+    summary = benchmark(ai_service.generate_summary, summarize_backend, "Plants turn light energy into glucose.")
+    assert summary.startswith("This article states that")
+
+def bench_build_research_prompt(benchmark):
+    benchmark(ai_service.build_research_prompt, "How do plants make energy from light?", "happy")
+
+def bench_research_prompt_and_tokenize(benchmark, tokenizer):
+    def build_and_tokenize():
+        prompt = ai_service.build_research_prompt("How do plants make energy from light?", "happy")
+        return tokenizer(prompt, return_tensors="pt")
+
+    inputs = benchmark(build_and_tokenize)
+    assert inputs["input_ids"].shape[1] > 0
+
+def _answer_ids(tokenizer) -> list[int]:
+    words = "light energy plant cell water chlorophyll glucose oxygen carbon leaf sun".split()
+    text = " ".join(words[i % len(words)] for i in range(600))
+    return tokenizer(text, add_special_tokens=False)["input_ids"]
+
+def bench_incremental_detokenize(benchmark, tokenizer):
+    from app.services import llm_backends
+
+    ids = _answer_ids(tokenizer)
+
+    def stream():
+        detokenizer = llm_backends.IncrementalDetokenizer(tokenizer)
+        return "".join(detokenizer.push([token_id]) for token_id in ids) + detokenizer.flush()
+
+    assert benchmark(stream) == tokenizer.decode(ids, skip_special_tokens=True)
+
+def bench_full_redecode_per_token(benchmark, tokenizer):
+    """Baseline: re-decoding everything generated so far on every step."""
+    ids = _answer_ids(tokenizer)
+
+    def stream():
+        text = ""
+        for end in range(1, len(ids) + 1):
+            text = tokenizer.decode(ids[:end], skip_special_tokens=True)
+        return text
+
+    benchmark(stream)
@@ -0,0 +1,6 @@
+from app.services import audio_service
+
+def bench_transcribe_webm(benchmark, whisper_model, webm_audio):
+    # webm -> ffmpeg -> 16 kHz wav -> Whisper, as /api/transcribe does.
+    text = benchmark.pedantic(audio_service.transcribe_audio_bytes, args=(whisper_model, webm_audio), rounds=5, warmup_rounds=1)
+    assert isinstance(text, str)
@@ -0,0 +1,20 @@
+import random
+import pytest
+from app.services import compression_service
+
+WORDS = (
+    "protein folding structure prediction model neural network attention residue sequence alignment "
+    "accuracy dataset training evaluation benchmark energy molecule chain contact map experiment"
+).split()
+
+def _article(sentences: int) -> str:
+    rng = random.Random(sentences)
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 24))).capitalize() + "." for _ in range(sentences)
+    )
+
+@pytest.mark.parametrize("sentences", [50, 300, 3000])
+def bench_compress_article(benchmark, sentences):
+    text = _article(sentences)
+    compressed = benchmark(compression_service.compress, text, 768)
+    assert compression_service.estimate_tokens(compressed) <= 768
@@ -0,0 +1,10 @@
+import base64
+from app.services import emotion_service
+
+def bench_decode_data_url(benchmark, fixture_jpeg):
+    data_url = "data:image/jpeg;base64," + base64.b64encode(fixture_jpeg).decode()
+    assert benchmark(emotion_service.decode_data_url, data_url) == fixture_jpeg
+
+def bench_detect_emotion_from_bytes(benchmark, detector, fixture_jpeg):
+    result = benchmark(emotion_service.detect_emotion_from_bytes, detector, fixture_jpeg)
+    assert result["emotion"] != "error"
@@ -0,0 +1,44 @@
+import json
+import pytest
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from app.api.responses import json_response
+from app.services import external_api_service
+
+def _lens_payload(count: int = 60) -> dict:
+    """Roughly the shape and size of a Serper Lens response."""
+    return {
+        "searchParameters": {"url": "https://example.com/static/images/photo.jpg", "type": "lens", "engine": "google", "num": 10, "page": 1},
+        "organic": [
+            {
+                "title": f"Result {i} - a fairly long page title describing a similar photograph",
+                "source": "Example",
+                "sourceIcon": "data:image/png;base64," + "A" * 600,
+                "link": f"https://example.com/pages/{i}",
+                "imageUrl": f"https://images.example.com/full/{i}.jpg",
+                "imageWidth": 1920,
+                "imageHeight": 1080,
+                "thumbnailUrl": f"https://encrypted-tbn0.gstatic.com/images?q=tbn:{'x' * 80}{i}",
+                "thumbnailWidth": 300,
+                "thumbnailHeight": 168,
+                "position": i + 1,
+            }
+            for i in range(count)
+        ],
+        "credits": 3,
+    }
+
+def _request(accept_encoding: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]})
+
+def bench_lens_response_verbatim(benchmark):
+    payload = _lens_payload()
+    body = benchmark(lambda: json.dumps(jsonable_encoder(payload)).encode())
+    benchmark.extra_info["bytes"] = len(body)
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "gzip", "br"])
+def bench_lens_response_projected(benchmark, accept_encoding):
+    payload = _lens_payload()
+    request = _request(accept_encoding)
+    response = benchmark(lambda: json_response(request, external_api_service.project_lens(payload)))
+    benchmark.extra_info["bytes"] = len(response.body)
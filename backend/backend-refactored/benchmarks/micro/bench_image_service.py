@@ -0,0 +1,10 @@
+import pytest
+from app.services import image_service
+
+@pytest.mark.parametrize("fmt", ["webp", "jpeg"])
+def bench_render_variant_tile(benchmark, fixture_jpeg, tmp_path, fmt):
+    source = tmp_path / "source.jpg"
+    source.write_bytes(fixture_jpeg)
+    dest = image_service.variant_path(source, 480, fmt)
+    benchmark(image_service.render_variant, source, dest, 480, fmt)
+    assert dest.stat().st_size < len(fixture_jpeg)
@@ -0,0 +1,11 @@
+from app.services import keyword_service
+
+QUESTION = "How do plants convert sunlight into chemical energy during photosynthesis in the chloroplast?"
+
+def bench_extract_keywords(benchmark, embedder):
+    keywords = benchmark(keyword_service.extract_keywords, embedder, QUESTION)
+    assert 0 < len(keywords) <= 3
+
+def bench_cached_keywords_hit(benchmark, embedder):
+    keyword_service.cached_keywords(embedder, QUESTION)
+    assert benchmark(keyword_service.cached_keywords, embedder, "  " + QUESTION.upper())
@@ -0,0 +1,52 @@
+import os
+import pytest
+from benchmarks import common, standins
+
+@pytest.fixture(scope="session")
+def tokenizer():
+    """The production tokenizer when BENCH_TOKENIZER names one, else the tiny stand-in."""
+    name = os.environ.get("BENCH_TOKENIZER")
+    if name:
+        from transformers import AutoTokenizer
+        return AutoTokenizer.from_pretrained(name)
+    return standins.build_tiny_tokenizer()
+
+@pytest.fixture(scope="session")
+def summarize_backend():
+    """Transformers backend on the tiny random-init Llama: measures the streaming/decode overhead."""
+    from app.services import llm_backends
+
+    tokenizer, _, model_summarize, device = standins.load_tiny_llm()
+    return llm_backends.TransformersBackend(tokenizer, model_summarize, device, "summarize")
+
+@pytest.fixture(scope="session", params=[path.name for path in common.FIXTURE_IMAGES])
+def fixture_jpeg(request) -> bytes:
+    return next(path for path in common.FIXTURE_IMAGES if path.name == request.param).read_bytes()
+
+@pytest.fixture(scope="session")
+def detector():
+    """Real FER when BENCH_REAL_FER=1, otherwise the stub (measures decode only)."""
+    if os.environ.get("BENCH_REAL_FER") == "1":
+        from app.services import emotion_service
+        return emotion_service.load_detector()
+    return standins.load_stub_detector()
+
+@pytest.fixture(scope="session")
+def embedder():
+    """The real keyword model when BENCH_REAL_KEYWORDS=1, otherwise the stub (measures candidates + MMR)."""
+    if os.environ.get("BENCH_REAL_KEYWORDS") == "1":
+        from app.services import keyword_service
+        return keyword_service.load_embedder()
+    return standins.load_stub_embedder()
+
+@pytest.fixture(scope="session")
+def webm_audio(tmp_path_factory) -> bytes:
+    path = standins.make_webm_fixture(tmp_path_factory.mktemp("audio") / "tone.webm")
+    if path is None:
+        pytest.skip("ffmpeg is not available")
+    return path.read_bytes()
+
+@pytest.fixture(scope="session")
+def whisper_model():
+    pytest.importorskip("whisper")
+    return standins.load_tiny_whisper()
@@ -0,0 +1,47 @@
+"""Runs the hot-path micro-benchmarks and records them per commit.
+
+Usage (from backend/backend-refactored):
+    python -m benchmarks.micro.run                    # all benchmarks
+    python -m benchmarks.micro.run -k emotion         # extra args go to pytest
+    python -m benchmarks.micro.run compare results/abc-micro.json results/def-micro.json
+"""
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from benchmarks import common
+
+MICRO_DIR = Path(__file__).resolve().parent
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        common.compare(Path(sys.argv[2]), Path(sys.argv[3]), ("median_us", "mean_us", "ops"))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = Path(tmp) / "benchmark.json"
+        code = subprocess.call(
+            [sys.executable, "-m", "pytest", str(MICRO_DIR), "-q", f"--benchmark-json={raw_path}", *sys.argv[1:]],
+            cwd=common.PROJECT_DIR,
+        )
+        if not raw_path.exists():
+            sys.exit(code)
+        raw = json.loads(raw_path.read_text())
+
+    results = {
+        bench["name"]: {
+            "median_us": round(bench["stats"]["median"] * 1e6, 3),
+            "mean_us": round(bench["stats"]["mean"] * 1e6, 3),
+            "stddev_us": round(bench["stats"]["stddev"] * 1e6, 3),
+            "ops": round(bench["stats"]["ops"], 2),
+            "rounds": bench["stats"]["rounds"],
+        }
+        for bench in raw["benchmarks"]
+    }
+    path = common.write_results("micro", {"machine": raw.get("machine_info", {}), "results": results})
+    print(f"Results written to {path}")
+    sys.exit(code)
+
+if __name__ == "__main__":
+    main()
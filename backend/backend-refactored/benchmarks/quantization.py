@@ -0,0 +1,114 @@
+"""Tokens/sec and memory of the research model under each LLM_QUANTIZATION mode.
+
+Each mode runs in its own interpreter so peak RSS is not polluted by the
+previous mode's weights. Models are loaded through ai_service.load_hf_models,
+so the fp32-agreement check and its fallback are part of what is measured.
+
+Usage (from backend/backend-refactored):
+    python -m benchmarks.quantization
+    python -m benchmarks.quantization --modes none int8-dynamic --new-tokens 64
+    python -m benchmarks.quantization compare results/a-quantization.json results/b-quantization.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import PROJECT_DIR, compare, write_results
+
+# Bare questions; run_child wraps them in the production research prompt.
+PROMPTS = [
+    "What is photosynthesis?",
+    "How do vaccines train the immune system?",
+]
+
+def run_child(new_tokens: int, threads: int | None):
+    """Loads the models for the mode in LLM_QUANTIZATION and prints one JSON line."""
+    import psutil
+    import torch
+
+    from app.core.config import settings
+    from app.services import ai_service
+
+    if threads:
+        torch.set_num_threads(threads)
+    process = psutil.Process()
+    started = time.perf_counter()
+    tokenizer, model, _, device = ai_service.load_hf_models()
+    load_seconds = time.perf_counter() - started
+
+    rates = []
+    for question in PROMPTS:
+        inputs = tokenizer(ai_service.build_research_prompt(question, "neutral"), return_tensors="pt").to(device)
+        with torch.no_grad():
+            started = time.perf_counter()
+            output = model.generate(
+                **inputs, max_new_tokens=new_tokens, min_new_tokens=new_tokens, do_sample=False, pad_token_id=tokenizer.eos_token_id
+            )
+            elapsed = time.perf_counter() - started
+        rates.append((output.shape[1] - inputs["input_ids"].shape[1]) / elapsed)
+
+    info = process.memory_info()
+    peak = getattr(info, "peak_wset", None) or _peak_rss_bytes() or info.rss
+    print(json.dumps({
+        "mode": settings.LLM_QUANTIZATION,
+        "quantized": any("quantized" in type(m).__module__ or "quanto" in type(m).__module__ for m in model.modules()),
+        "load_seconds": round(load_seconds, 2),
+        "tokens_per_second": round(sum(rates) / len(rates), 2),
+        "rss_mb": round(info.rss / 2**20, 1),
+        "peak_rss_mb": round(peak / 2**20, 1),
+    }))
+
+def _peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+def measure(mode: str, new_tokens: int, threads: int | None) -> dict:
+    command = [sys.executable, "-m", "benchmarks.quantization", "--child", "--new-tokens", str(new_tokens)]
+    if threads:
+        command += ["--threads", str(threads)]
+    proc = subprocess.run(
+        command, cwd=PROJECT_DIR, env={**os.environ, "LLM_QUANTIZATION": mode}, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {"mode": mode, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+    cmp = sub.add_parser("compare", help="Diff two result files")
+    cmp.add_argument("baseline", type=Path)
+    cmp.add_argument("candidate", type=Path)
+    parser.add_argument("--modes", nargs="+", default=["none", "int8-dynamic", "int8-weight", "int4-weight"])
+    parser.add_argument("--new-tokens", type=int, default=128)
+    parser.add_argument("--threads", type=int, help="torch.set_num_threads in each child")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(args.baseline, args.candidate, ("tokens_per_second", "peak_rss_mb", "load_seconds"))
+        return
+    if args.child:
+        run_child(args.new_tokens, args.threads)
+        return
+
+    results = {}
+    for mode in args.modes:
+        print(f"Measuring {mode}...", flush=True)
+        results[mode] = measure(mode, args.new_tokens, args.threads)
+        print(f"  {results[mode]}")
+    path = write_results("quantization", {"new_tokens": args.new_tokens, "threads": args.threads, "results": results}, args.output)
+    print(f"Results written to {path}")
+
+if __name__ == "__main__":
+    main()
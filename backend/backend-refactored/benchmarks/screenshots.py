@@ -0,0 +1,131 @@
+"""Latency of /screenshot captures against a local static HTTP server.
+
+Serves a small page from a temporary directory and captures it repeatedly in
+three ways: a fresh Chrome per request (the old behaviour), the warm
+BrowserPool with the capture cache bypassed, and cache hits. Needs Chrome and
+chromedriver on PATH.
+
+Usage (from backend/backend-refactored):
+    python -m benchmarks.screenshots
+    python -m benchmarks.screenshots --requests 50 --pool-size 4
+    python -m benchmarks.screenshots compare results/a-screenshots.json results/b-screenshots.json
+"""
+import argparse
+import functools
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from benchmarks.common import compare, percentile, write_results
+
+PAGE = """<!doctype html><html><head><title>fixture</title></head>
+<body style="font-family: sans-serif"><h1>Screenshot fixture</h1>
+<p id="visits"></p>
+<script>
+  // Counts visits in localStorage; with isolated contexts every capture shows 1.
+  const n = Number(localStorage.getItem("visits") || 0) + 1;
+  localStorage.setItem("visits", n);
+  document.getElementById("visits").textContent = "visits: " + n;
+</script></body></html>"""
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def serve(directory: str) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def summarize(latencies: list[float], wall: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 1),
+        "throughput_rps": round(len(ordered) / wall, 2),
+    }
+
+def run(capture_one, requests: int, concurrency: int) -> dict:
+    def timed(i):
+        started = time.perf_counter()
+        capture_one(i)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(timed, range(requests)))
+    return summarize(latencies, time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+    cmp = sub.add_parser("compare", help="Diff two result files")
+    cmp.add_argument("baseline", type=Path)
+    cmp.add_argument("candidate", type=Path)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(args.baseline, args.candidate, ("p50_ms", "p95_ms", "throughput_rps"))
+        return
+
+    from app.core.config import settings
+    from app.services import screenshot_service
+
+    width, height = settings.SCREENSHOT_VIEWPORT
+    with tempfile.TemporaryDirectory() as directory:
+        Path(directory, "index.html").write_text(PAGE)
+        server = serve(directory)
+        base_url = f"http://127.0.0.1:{server.server_port}/index.html"
+
+        def fresh_browser(i):
+            pool = screenshot_service.BrowserPool(1, 1)
+            try:
+                screenshot_service.capture(pool, f"{base_url}?fresh={i}", width, height)
+            finally:
+                pool.close()
+
+        pool = screenshot_service.BrowserPool(args.pool_size, settings.SCREENSHOT_MAX_USES)
+        pool.warm()
+        results = {}
+        try:
+            print("Measuring fresh browser per request...", flush=True)
+            results["fresh"] = run(fresh_browser, args.requests, args.concurrency)
+            print("Measuring warm pool...", flush=True)
+            # A distinct query string per request keeps the capture cache out of the measurement.
+            results["pooled"] = run(
+                lambda i: screenshot_service.capture(pool, f"{base_url}?pooled={i}", width, height),
+                args.requests, args.concurrency,
+            )
+            print("Measuring cache hits...", flush=True)
+            screenshot_service.capture(pool, base_url, width, height)
+            results["cached"] = run(
+                lambda i: screenshot_service.capture(pool, base_url, width, height), args.requests, args.concurrency
+            )
+            results["thumbnail"] = run(
+                lambda i: screenshot_service.capture(pool, base_url, width, height, 320), args.requests, args.concurrency
+            )
+        finally:
+            pool.close()
+            server.shutdown()
+
+    for name, result in results.items():
+        print(f"  {name:<10} p50 {result['p50_ms']:>8.1f}ms  p95 {result['p95_ms']:>8.1f}ms  {result['throughput_rps']:>7.2f} req/s")
+    path = write_results(
+        "screenshots",
+        {"requests": args.requests, "concurrency": args.concurrency, "pool_size": args.pool_size, "results": results},
+        args.output,
+    )
+    print(f"Results written to {path}")
+
+if __name__ == "__main__":
+    main()
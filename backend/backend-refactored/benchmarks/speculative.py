@@ -0,0 +1,101 @@
+"""Wall-clock effect of speculative decoding on the research/summarize prompts.
+
+Loads HF_MODEL_ID once and runs the same prompts plain, with prompt-lookup
+drafting and (when --draft-model is given) with a small assistant model.
+With --greedy every mode must reproduce the plain output exactly, which
+checks that verification is lossless; otherwise the production sampling
+settings are used with a fixed seed per prompt.
+
+Usage (from backend/backend-refactored):
+    python -m benchmarks.speculative
+    python -m benchmarks.speculative --draft-model <small-llama3-tokenizer-model> --greedy
+    python -m benchmarks.speculative compare results/a-speculative.json results/b-speculative.json
+"""
+import argparse
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from benchmarks.common import compare, write_results
+
+RESEARCH_QUESTIONS = [
+    ("How do plants make energy from light?", "happy"),
+    ("Why does the Moon have phases?", "neutral"),
+]
+SUMMARY_CONTENT = [
+    "Title: Attention Is All You Need\nSnippet: The dominant sequence transduction models are based on complex recurrent "
+    "or convolutional neural networks. We propose a new simple network architecture, the Transformer, based solely on "
+    "attention mechanisms, dispensing with recurrence and convolutions entirely.",
+]
+
+def run_mode(backend, tokenizer, greedy: bool, max_new_tokens: int) -> dict:
+    import torch
+
+    from app.services import ai_service
+
+    research = replace(ai_service.RESEARCH_PARAMS, max_new_tokens=max_new_tokens, do_sample=not greedy)
+    jobs = [(ai_service.build_research_prompt(q, e), research) for q, e in RESEARCH_QUESTIONS]
+    jobs += [(ai_service.build_summary_prompt(c), ai_service.SUMMARY_PARAMS) for c in SUMMARY_CONTENT]
+
+    outputs, seconds, tokens = [], 0.0, 0
+    for seed, (prompt, params) in enumerate(jobs):
+        torch.manual_seed(seed)
+        started = time.perf_counter()
+        text = "".join(backend.generate(prompt, params))
+        seconds += time.perf_counter() - started
+        tokens += len(tokenizer(text, add_special_tokens=False)["input_ids"])
+        outputs.append(text)
+    return {"seconds": round(seconds, 2), "tokens": tokens, "tokens_per_second": round(tokens / seconds, 2), "outputs": outputs}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+    cmp = sub.add_parser("compare", help="Diff two result files")
+    cmp.add_argument("baseline", type=Path)
+    cmp.add_argument("candidate", type=Path)
+    parser.add_argument("--draft-model", help="Assistant model id sharing the main tokenizer")
+    parser.add_argument("--draft-tokens", type=int, default=5)
+    parser.add_argument("--lookup-tokens", type=int, default=10)
+    parser.add_argument("--max-new-tokens", type=int, default=512)
+    parser.add_argument("--greedy", action="store_true", help="Greedy decoding; outputs must match across modes")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(args.baseline, args.candidate, ("seconds", "tokens_per_second", "speedup"))
+        return
+
+    from app.services import ai_service, llm_backends
+
+    tokenizer, model, _, device = ai_service.load_hf_models()
+    modes = {"off": {}, "prompt-lookup": {"prompt_lookup_num_tokens": args.lookup_tokens}}
+    if args.draft_model:
+        from transformers import AutoModelForCausalLM
+
+        draft = AutoModelForCausalLM.from_pretrained(args.draft_model, torch_dtype=model.dtype).to(device).eval()
+        draft.generation_config.num_assistant_tokens = args.draft_tokens
+        modes["draft"] = {"assistant_model": draft}
+
+    results = {}
+    for mode, speculation in modes.items():
+        print(f"Measuring {mode}...", flush=True)
+        backend = llm_backends.TransformersBackend(tokenizer, model, device, "research", speculation)
+        results[mode] = run_mode(backend, tokenizer, args.greedy, args.max_new_tokens)
+
+    baseline = results["off"]
+    for mode, result in results.items():
+        result["speedup"] = round(baseline["seconds"] / result["seconds"], 2)
+        if args.greedy:
+            result["matches_plain"] = result["outputs"] == baseline["outputs"]
+        print(f"  {mode:<14} {result['seconds']:>8.2f}s {result['tokens_per_second']:>8.2f} tok/s  x{result['speedup']}"
+              + (f"  matches plain: {result['matches_plain']}" if args.greedy else ""))
+
+    path = write_results(
+        "speculative",
+        {"greedy": args.greedy, "max_new_tokens": args.max_new_tokens, "draft_model": args.draft_model, "results": results},
+        args.output,
+    )
+    print(f"Results written to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Tiny stand-ins for the production models so benchmarks run anywhere in seconds.
+
+They keep the real code paths (tokenizer + generate, FER-shaped detector,
+Whisper transcribe, Piper subprocess, Ollama HTTP) but swap the weights for
+small or fake ones.
+"""
+import os
+import stat
+import sys
+import textwrap
+from pathlib import Path
+
+LLAMA_SPECIAL_TOKENS = ["<|begin_of_text|>", "<|start_header_id|>", "<|end_header_id|>", "<|eot_id|>"]
+
+def build_tiny_tokenizer():
+    """Word-level fast tokenizer with the Llama 3 chat markers as special tokens."""
+    from tokenizers import Tokenizer, models, pre_tokenizers, decoders
+    from transformers import PreTrainedTokenizerFast
+
+    words = (
+        "the a an of to and in is that for it as with was on by this are be or from at "
+        "article states summary query emotion user system assistant teacher explain topic "
+        "learning model data energy light plant cell water science history math example"
+    ).split()
+    vocab = {"<unk>": 0, "<pad>": 1}
+    for token in LLAMA_SPECIAL_TOKENS + words + [chr(c) for c in range(33, 127)]:
+        vocab.setdefault(token, len(vocab))
+
+    backend = Tokenizer(models.WordLevel(vocab=vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.Sequence([pre_tokenizers.WhitespaceSplit(), pre_tokenizers.Punctuation()])
+    backend.decoder = decoders.WordPiece(prefix="##")
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="<unk>", pad_token="<pad>", eos_token="<|eot_id|>")
+    tokenizer.add_special_tokens({"additional_special_tokens": LLAMA_SPECIAL_TOKENS})
+    return tokenizer
+
+def load_tiny_llm():
+    """Drop-in for ai_service.load_hf_models backed by a random-init 2-layer Llama."""
+    import torch
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    torch.manual_seed(0)
+    tokenizer = build_tiny_tokenizer()
+    config = LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=64,
+        intermediate_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+        max_position_embeddings=4096,
+        eos_token_id=tokenizer.eos_token_id,
+        pad_token_id=tokenizer.pad_token_id,
+    )
+    model_research = LlamaForCausalLM(config).eval()
+    model_summarize = LlamaForCausalLM(config).eval()
+    return tokenizer, model_research, model_summarize, "cpu"
+
+class StubDetector:
+    """FER-shaped detector that answers instantly."""
+    def top_emotion(self, image):
+        return ("happy", 0.93) if image.mean() > 64 else (None, None)
+
+def load_stub_detector():
+    return StubDetector()
+
+class StubEmbedder:
+    """SentenceTransformer-shaped encoder returning stable pseudo-random unit vectors."""
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, convert_to_numpy=True):
+        import hashlib
+        import numpy as np
+
+        vectors = np.stack([
+            np.random.default_rng(int.from_bytes(hashlib.sha256(s.encode()).digest()[:8], "little")).standard_normal(384)
+            for s in sentences
+        ])
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+def load_stub_embedder():
+    return StubEmbedder()
+
+def load_tiny_whisper():
+    """The real Whisper pipeline with the 39M-parameter 'tiny' checkpoint."""
+    import whisper
+
+    return whisper.load_model("tiny")
+
+FAKE_PIPER = textwrap.dedent('''\
+    """Piper-compatible CLI that writes silence: ~60 ms of audio per input character."""
+    import sys
+    import wave
+
+    output = sys.argv[sys.argv.index("--output_file") + 1]
+    text = sys.stdin.read()
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(22050)
+        wav.writeframes(b"\\x00\\x00" * int(22050 * 0.06 * max(1, len(text))))
+''')
+
+def write_fake_piper(directory: Path) -> Path:
+    """Writes an executable fake Piper into `directory` and returns its path."""
+    directory.mkdir(parents=True, exist_ok=True)
+    script = directory / "fake_piper.py"
+    script.write_text(FAKE_PIPER)
+    launcher = directory / "piper"
+    launcher.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+    launcher.chmod(launcher.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return launcher
+
+def make_webm_fixture(path: Path, seconds: float = 3.0) -> Path | None:
+    """Synthesizes a short Opus/WebM tone with ffmpeg; None if ffmpeg is missing."""
+    import subprocess
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        subprocess.run(
+            ["ffmpeg", "-y", "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}", "-c:a", "libopus", str(path)],
+            check=True, capture_output=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return path
+
+def install(tmp_dir: Path, ollama_port: int):
+    """Points settings at the stand-ins. Must run before `app` is imported."""
+    os.environ["PIPER_EXECUTABLE"] = str(write_fake_piper(tmp_dir))
+    os.environ["PIPER_MODEL_PATH"] = str(tmp_dir / "fake.onnx")
+    os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{ollama_port}"
+    os.environ.setdefault("SERPER_API_KEY", "benchmark")
+
+    from app.services import ai_service, audio_service, emotion_service, keyword_service
+
+    ai_service.load_hf_models = load_tiny_llm
+    emotion_service.load_detector = load_stub_detector
+    audio_service.load_whisper_model = load_tiny_whisper
+    keyword_service.load_embedder = load_stub_embedder
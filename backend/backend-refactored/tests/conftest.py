@@ -0,0 +1,4 @@
+import os
+
+# Settings requires a Serper key; tests never call Serper.
+os.environ.setdefault("SERPER_API_KEY", "test")
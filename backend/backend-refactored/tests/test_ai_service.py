@@ -0,0 +1,12 @@
+from app.core.config import settings
+from app.services import ai_service
+
+def test_research_without_a_level_keeps_the_full_budget():
+    assert ai_service.research_params(None) is ai_service.RESEARCH_PARAMS
+    assert ai_service.research_params(None).max_new_tokens == 1024
+
+def test_research_level_sets_only_the_token_budget():
+    for level, tokens in settings.RESEARCH_LEVEL_TOKENS.items():
+        params = ai_service.research_params(level)
+        assert params.max_new_tokens == tokens
+        assert params.temperature == ai_service.RESEARCH_PARAMS.temperature
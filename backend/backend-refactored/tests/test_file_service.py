@@ -0,0 +1,36 @@
+import asyncio
+import io
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+from app.core.config import settings
+from app.services import file_service
+
+def _upload(data: bytes, filename: str, content_type: str = "image/png") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename, headers=Headers({"content-type": content_type}))
+
+def _png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+@pytest.fixture(autouse=True)
+def image_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_DIR", tmp_path)
+    return tmp_path
+
+def test_stored_suffix_comes_from_the_decoded_format(image_dir):
+    path, image_hash = asyncio.run(file_service.save_upload_hashed(_upload(_png(), "page.html")))
+    assert path == image_dir / f"{image_hash}.png"
+    assert [p.name for p in image_dir.iterdir()] == [path.name]
+
+@pytest.mark.parametrize("data, filename", [
+    (b"<html><script>alert(1)</script></html>", "x.html"),
+    (b'<svg xmlns="http://www.w3.org/2000/svg" onload="alert(1)"/>', "x.svg"),
+])
+def test_markup_uploads_are_rejected_and_not_stored(image_dir, data, filename):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(file_service.save_upload_hashed(_upload(data, filename, "image/svg+xml")))
+    assert error.value.status_code == 400
+    assert list(image_dir.iterdir()) == []
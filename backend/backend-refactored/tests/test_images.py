@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+from app.api.routers import images
+from app.core.config import settings
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_DIR", tmp_path)
+    Image.new("RGB", (64, 48), "blue").save(tmp_path / "photo.png")
+    app = FastAPI()
+    app.include_router(images.router, prefix="/api")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        app.state.image_executor = executor
+        yield TestClient(app)
+
+def test_variant_revalidates_against_any_listed_etag(client):
+    etag = client.get("/api/images/photo.png?w=160&fmt=jpeg").headers["etag"]
+    for if_none_match in (etag, f'"other", W/{etag}', "*"):
+        response = client.get("/api/images/photo.png?w=160&fmt=jpeg", headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+
+def test_variant_renders_when_no_listed_etag_matches(client):
+    response = client.get("/api/images/photo.png?w=160&fmt=jpeg", headers={"If-None-Match": '"stale", W/"older"'})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+
+def test_variant_of_a_decompression_bomb_is_unsupported(client, monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 16)
+    response = client.get("/api/images/photo.png?w=160&fmt=jpeg")
+    assert response.status_code == 415
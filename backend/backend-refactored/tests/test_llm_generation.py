@@ -0,0 +1,80 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+import pytest
+import torch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routers import ai_processing
+from app.services import llm_backends
+from app.services.model_registry import ModelRegistry
+from benchmarks import standins
+
+EOT = "<|eot_id|>"
+# The greedy next token after each of these; every chain ends on the end-of-turn stop token.
+SUCCESSORS = {
+    "data": "light", "light": EOT,
+    "plant": "cell", "cell": "water", "water": EOT,
+    "math": "history", "history": "example", "example": "model", "model": EOT,
+    "that": "topic", "topic": EOT,  # the summary prompt ends with SUMMARY_LEAD
+}
+PARAMS = llm_backends.GenerationParams(max_new_tokens=8)
+
+@pytest.fixture(scope="module")
+def backend():
+    """The tiny stand-in Llama rewired to follow SUCCESSORS deterministically.
+
+    With the attention and MLP outputs zeroed, the last hidden state is just the
+    current token's (one-hot) embedding, so lm_head alone picks the next token.
+    """
+    tokenizer, model, _, device = standins.load_tiny_llm()
+    dims = {token: dim for dim, token in enumerate(sorted({*SUCCESSORS, *SUCCESSORS.values()}))}
+    with torch.no_grad():
+        for layer in model.model.layers:
+            layer.self_attn.o_proj.weight.zero_()
+            layer.mlp.down_proj.weight.zero_()
+        model.lm_head.weight.zero_()
+        for token, dim in dims.items():
+            embedding = model.model.embed_tokens.weight[tokenizer.convert_tokens_to_ids(token)]
+            embedding.zero_()
+            embedding[dim] = 1.0
+        for token, successor in SUCCESSORS.items():
+            model.lm_head.weight[tokenizer.convert_tokens_to_ids(successor), dims[token]] = 10.0
+    return llm_backends.TransformersBackend(tokenizer, model, device, "summarize")
+
+def test_generate_streams_until_the_stop_token(backend):
+    deltas = list(backend.generate("the plant", PARAMS))
+    assert len(deltas) > 1
+    assert "".join(deltas) == "cell water"
+
+def test_generate_batch_finishes_rows_independently_and_keeps_their_indexes(backend):
+    # Token lengths 4, 1, 2: the batch runs them sorted as [1, 2, 0].
+    prompts = ["the the the data", "math", "the plant"]
+    results = list(backend.generate_batch(prompts, PARAMS))
+
+    assert dict(results) == {0: "light", 1: "history example model", 2: "cell water"}
+    # Each row is yielded when it reaches its own stop token, shortest answer first.
+    assert [index for index, _ in results] == [0, 2, 1]
+
+def test_summarize_batch_endpoint_streams_ndjson(backend):
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        registry = ModelRegistry()
+        registry.register("llm", lambda: {"research": backend, "summarize": backend})
+        registry.start()
+        while not registry.all_ready():
+            await asyncio.sleep(0.01)
+        app.state.models = registry
+        yield
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(ai_processing.router, prefix="/api")
+    contents = ["Plants make energy from light.", "Water is a molecule.", "Cells divide."]
+    with TestClient(app) as client:
+        response = client.post("/api/summarize/batch", json={"contents": contents})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert all(line["answer"] == "This article states that topic" for line in lines)
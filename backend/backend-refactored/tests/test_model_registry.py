@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from app.core.config import settings
+from app.services.model_registry import ModelNotReady, ModelRegistry
+
+async def _wait_for_state(registry: ModelRegistry, name: str, state: str):
+    for _ in range(200):
+        if registry.status()[name]["state"] == state:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{name} never reached {state}: {registry.status()[name]}")
+
+def _get_from_thread(registry: ModelRegistry, name: str):
+    """get() as the sync dependencies call it, from a threadpool thread."""
+    try:
+        return registry.get(name)
+    except ModelNotReady as e:
+        return e
+
+def test_lazy_model_loads_when_first_requested_from_a_worker_thread():
+    loader_threads = []
+
+    def loader():
+        loader_threads.append(threading.current_thread())
+        return "model"
+
+    async def scenario():
+        registry = ModelRegistry()
+        registry.register("lazy", loader, lazy=True)
+        registry.start()
+
+        first = await asyncio.to_thread(_get_from_thread, registry, "lazy")
+        assert isinstance(first, ModelNotReady)
+        await _wait_for_state(registry, "lazy", "ready")
+        assert await asyncio.to_thread(_get_from_thread, registry, "lazy") == "model"
+
+    asyncio.run(scenario())
+    assert len(loader_threads) == 1
+
+def test_failed_model_is_retried_from_a_worker_thread(monkeypatch):
+    monkeypatch.setattr(settings, "MODEL_RETRY_SECONDS", 0)
+    attempts = []
+
+    def loader():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("first load fails")
+        return "model"
+
+    async def scenario():
+        registry = ModelRegistry()
+        registry.register("flaky", loader)
+        registry.start()
+        await _wait_for_state(registry, "flaky", "failed")
+
+        retry = await asyncio.to_thread(_get_from_thread, registry, "flaky")
+        assert isinstance(retry, ModelNotReady)
+        await _wait_for_state(registry, "flaky", "ready")
+        assert registry.get("flaky") == "model"
+
+    asyncio.run(scenario())
+    assert len(attempts) == 2
@@ -1,6 +1,7 @@
 
 import React, { useState, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
+import { variantUrl } from '../services/imageVariants';
 
 // Animation variants for the loading indicator
 const loadingContainerVariants = {
@@ -95,7 +96,7 @@ export const ImageDisplayWindow = ({ imageUrls }) => {
       <AnimatePresence mode="wait">
         <motion.img
           key={currentIndex}
-          src={imageUrls[currentIndex]}
+          src={variantUrl(imageUrls[currentIndex], 1280)}
           alt={``}
           initial={{ opacity: 0, scale: 0.95 }}
           animate={{ opacity: 1, scale: 1 }}
@@ -1,6 +1,7 @@
 import React from 'react';
 import { motion } from 'framer-motion';
 import { ExternalLink, Image, Eye } from 'lucide-react';
+import { variantUrl } from '../services/imageVariants';
 
 export const ImageSearchTiles = ({ imageSearchData, isLoading }) => {
   if (isLoading) {
@@ -49,7 +50,7 @@ export const ImageSearchTiles = ({ imageSearchData, isLoading }) => {
             {/* Image */}
             <div className="relative h-40 bg-black/20">
               <img
-                src={result.thumbnailUrl || result.imageUrl}
+                src={variantUrl(result.thumbnailUrl || result.imageUrl, 480)}
                 alt={result.title}
                 className="w-full h-full object-cover"
                 onError={(e) => {
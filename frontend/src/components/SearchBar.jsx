@@ -88,7 +88,7 @@ export const SearchBar = ({ isMinimized, onSearch }) => {
   const [pendingQuery, setPendingQuery] = useState('');
 
   // --- START: State for Learning Level and Session ---
-  const [learningLevel, setLearningLevel] = useState(1);
+  const [learningLevel, setLearningLevel] = useState(null); // null: no level, full-length answers
   const [showLevelSelector, setShowLevelSelector] = useState(false);
   const [session, setSession] = useState({ isActive: false, query: '', mode: '', level: 1 });
   const [showBreakModal, setShowBreakModal] = useState(false);
@@ -203,12 +203,12 @@ const handleModeSelect = async (mode) => {
     
     console.log("--> Checkpoint 6: Returned from executeSearch. About to set session.");
 
-    // Start the session after the initial search
-    if (learningLevel < 3) {
+    // Start the session after the initial search (sessions only run with a learning level)
+    if (learningLevel && learningLevel < 3) {
       setSession({ isActive: true, query: pendingQuery, mode: mode, level: learningLevel });
       console.log("✅ SESSION STARTED: setSession has been called.");
     } else {
-      console.log("SESSION SKIPPED: Learning level is 3, no timer needed.");
+      console.log("SESSION SKIPPED: No learning level below 3, no timer needed.");
     }
   };
   // --- START: Handlers for Session Modals ---
@@ -276,10 +276,10 @@ const handleModeSelect = async (mode) => {
                   ref={levelButtonRef}
                   onClick={() => setShowLevelSelector(prev => !prev)}
                   className="p-2 rounded-full bg-white/10 hover:bg-white/20 transition-colors flex items-center"
-                  title={`Learning Level: ${learningLevels[learningLevel]}`}
+                  title={`Learning Level: ${learningLevels[learningLevel] || 'None'}`}
                 >
                   <Layers className="w-5 h-5 text-white/80" />
-                  <span className="text-white/80 font-semibold text-sm ml-2">{learningLevel}</span>
+                  <span className="text-white/80 font-semibold text-sm ml-2">{learningLevel ?? '–'}</span>
                 </button>
                 <AnimatePresence>
                   {showLevelSelector && (
@@ -1,15 +1,31 @@
 import { useState, useRef, useCallback } from 'react';
 
-const SUMMARIZE_API = 'https://api.erenyeager-dk.live/api/summarize'; // Change if needed
-const TTS_API = 'https://api.erenyeager-dk.live/api/text-to-speech';
+const SUMMARIZE_SPEAK_API = 'https://api.erenyeager-dk.live/api/summarize/speak'; // Change if needed
+
+// Decodes one base64 WAV sentence from the stream into a playable blob URL
+const toAudioUrl = (base64) => {
+  const bytes = Uint8Array.from(atob(base64), (c) => c.charCodeAt(0));
+  return URL.createObjectURL(new Blob([bytes], { type: 'audio/wav' }));
+};
 
 export const useSummarizeAndSpeak = () => {
   const [isLoading, setIsLoading] = useState(false);
   const [isPlaying, setIsPlaying] = useState(false);
   const [error, setError] = useState(null);
   const audioRef = useRef(null);
+  const queueRef = useRef([]);
+  const streamDoneRef = useRef(false);
+  const readerRef = useRef(null);
 
   const stop = useCallback(() => {
+    if (readerRef.current) {
+      readerRef.current.cancel();
+      readerRef.current = null;
+    }
+
+    queueRef.current.forEach((url) => URL.revokeObjectURL(url));
+    queueRef.current = [];
+
     if (audioRef.current) {
       audioRef.current.pause();
       audioRef.current = null;
@@ -22,16 +38,46 @@ export const useSummarizeAndSpeak = () => {
     setIsPlaying(false);
   }, []);
 
+  // Plays queued sentences back to back; called whenever a sentence arrives or one ends
+  const playNext = useCallback(() => {
+    if (audioRef.current) return;
+
+    const url = queueRef.current.shift();
+    if (!url) {
+      if (streamDoneRef.current) setIsPlaying(false);
+      return;
+    }
+
+    const audio = new Audio(url);
+    audioRef.current = audio;
+
+    audio.onloadeddata = () => setIsPlaying(true);
+    audio.onended = () => {
+      audioRef.current = null;
+      URL.revokeObjectURL(url);
+      playNext();
+    };
+    audio.onerror = () => {
+      setError("Audio playback failed");
+      audioRef.current = null;
+      URL.revokeObjectURL(url);
+      playNext();
+    };
+
+    audio.play().catch(() => {});
+  }, []);
+
   const summarizeAndSpeak = useCallback(async ({ title, snippet, author }) => {
     setIsLoading(true);
     setError(null);
     stop();
+    streamDoneRef.current = false;
 
     try {
-      // 1. Send paper info to /summarize
+      // Summary text and per-sentence audio arrive as NDJSON events while generation runs
       const combinedText = `Title: ${title}\nAuthor: ${author}\nSnippet: ${snippet}`;
 
-      const res = await fetch(SUMMARIZE_API, {
+      const res = await fetch(SUMMARIZE_SPEAK_API, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json'
@@ -40,41 +86,39 @@ export const useSummarizeAndSpeak = () => {
       });
 
       if (!res.ok) throw new Error(`Summarize failed: ${res.status}`);
-      const summary = await res.json(); // Assume API returns { summary }
-      console.log('[📄] Summary:', summary.answer);
-
-      // 2. Call TTS endpoint
-      const ttsRes = await fetch(TTS_API, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          text: summary.answer,
-          voice: 'en-US-Standard-A', // Adjust based on your TTS service
-          speed: 1.0
-        })
-      });
 
-      if (!ttsRes.ok) throw new Error(`TTS failed: ${ttsRes.status}`);
-      const blob = await ttsRes.blob();
-      const url = URL.createObjectURL(blob);
-
-      const audio = new Audio(url);
-      audioRef.current = audio;
-
-      audio.onloadeddata = () => setIsPlaying(true);
-      audio.onended = () => {
-        setIsPlaying(false);
-        audioRef.current = null;
-        URL.revokeObjectURL(url);
-      };
-      audio.onerror = () => {
-        setIsPlaying(false);
-        setError("Audio playback failed");
-        audioRef.current = null;
-        URL.revokeObjectURL(url);
-      };
-
-      await audio.play();
+      const reader = res.body.getReader();
+      readerRef.current = reader;
+      const decoder = new TextDecoder();
+      let buffered = '';
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+
+        const lines = buffered.split('\n');
+        buffered = lines.pop();
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const event = JSON.parse(line);
+          if (event.type === 'audio') {
+            queueRef.current.push(toAudioUrl(event.audio));
+            playNext();
+          } else if (event.type === 'error') {
+            setError(event.detail);
+          } else if (event.type === 'done') {
+            console.log('[📄] Summary:', event.answer);
+          }
+        }
+      }
+
+      // A newer request (or stop()) may have replaced this stream already
+      if (readerRef.current === reader) {
+        readerRef.current = null;
+        streamDoneRef.current = true;
+        if (!audioRef.current) setIsPlaying(false);
+      }
     } catch (err) {
       console.error('[❌] Error:', err);
       setError(err.message);
@@ -93,7 +137,7 @@ export const useSummarizeAndSpeak = () => {
     } finally {
       setIsLoading(false);
     }
-  }, [stop]);
+  }, [stop, playNext]);
 
   return {
     summarizeAndSpeak,
@@ -11,7 +11,7 @@ export const searchGlobalLLM = async (question, emotion, level) => {
       body: JSON.stringify({
         question: question,
         emotion: emotion || 'neutral', // Include emotion if available
-        level: level || 1
+        level: level // Omitted when no learning level is chosen: full-length answer
       })
     });
 
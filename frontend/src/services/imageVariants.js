@@ -0,0 +1,9 @@
+// Rewrites URLs of images stored on our backend (/static/images/...) to the
+// resized variant endpoint; external URLs are returned unchanged.
+export const variantUrl = (url, width) => {
+  if (typeof url !== 'string' || !url.includes('/static/images/')) {
+    return url;
+  }
+  const scale = Math.min(window.devicePixelRatio || 1, 2);
+  return `${url.replace('/static/images/', '/api/images/')}?w=${Math.round(width * scale)}`;
+};
@@ -13,7 +13,7 @@ export const searchLocalLLM = async (question, emotion, level) => {
       body: JSON.stringify({
         question: question,
         emotion: emotion || 'neutral',
-        level: level || 1
+        level: level // Omitted when no learning level is chosen
       })
     });
 